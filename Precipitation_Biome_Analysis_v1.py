@@ -1,5 +1,15 @@
+import numpy as np
 import pandas as pd
-import requests
+
+# Daily series are fetched once per (lat, lon, year, variable) and shared by every
+# analysis below (climate_store.py). Misses go out as one concurrent Open-Meteo
+# batch, and responses land in the on-disk cache (PALEO_HTTP_OFFLINE=1 replays them).
+from climate_store import get_climate_store, year_dates
+
+# Calendar-month aggregation for all points at once (handles missing days)
+from monthly_aggregation import DRY_MONTH_THRESHOLD, summarize_precipitation
+
+store = get_climate_store()
 
 
 # Example: Get precipitation for a point in the Amazon (Rainforest)
@@ -15,32 +25,32 @@ locations = [
 
 data_list = []
 
-for loc in locations:
-
-  url = f"https://archive-api.open-meteo.com/v1/archive?latitude={loc['lat']}&longitude={loc['lon']}&start_date=2023-01-01&end_date=2023-12-31&daily=precipitation_sum,temperature_2m_mean&timezone=UTC"
-  response = requests.get(url).json()
+# Fetch all locations at once (one request per point covering both variables)
+location_points = [(loc['lat'], loc['lon']) for loc in locations]
+store.prefetch(location_points, 2023, ("precipitation_sum", "temperature_2m_mean"))
+location_precip = store.get_matrix(location_points, 2023, "precipitation_sum")
+location_temp = store.get_matrix(location_points, 2023, "temperature_2m_mean")
 
-  try:
-    #  Acess the daily data
-    daily_data = response['daily']
+for loc, precip_values, temp_list in zip(locations, location_precip, location_temp):
 
+  # Failed fetches come back as all-NaN rows
+  if np.isnan(precip_values).all() or np.isnan(temp_list).all():
+    print(f"Could not retrieve data for {loc['name']}.")
+    continue
 
-    # Calculate annual sums and averages
+  # Calculate annual sums and averages (missing days are NaN)
 
-    annual_precip = sum(response['daily']['precipitation_sum'])
-    temp_list = daily_data['temperature_2m_mean']
-    avg_temp = sum(temp_list) / len(temp_list)
+  annual_precip = float(np.nansum(precip_values))
+  avg_temp = float(np.nanmean(temp_list))
 
 
-    # Append
+  # Append
 
-    data_list.append({"Location": loc['name'],
-    "Annual_Precip_mm": round(annual_precip, 2),
-    "Avg_Temp_C": round(avg_temp, 2)
+  data_list.append({"Location": loc['name'],
+  "Annual_Precip_mm": round(annual_precip, 2),
+  "Avg_Temp_C": round(avg_temp, 2)
 
-    })
-  except KeyError:
-    print(f"Could not retrieve data for {loc['name']}. API Response: {response}")
+  })
 
 
 # Create DataFrame
@@ -87,8 +97,6 @@ for i in range(df.shape[0]): # df.shape[0] is 4
 # The "Gradient" Project: Building a Transect
 ##########################################################################################
 
-import numpy as np
-
 # Start: Deep Amazon Rainforest (-3.0, -60.0)
 # End: Edge of the Brazilian Cerrado/Savanna (-15.0, -50.0)
 lat_start, lon_start = -3.0, -60.0
@@ -108,17 +116,19 @@ for i in range(10):
 
 # Fetch and plot "fall-off", graphing precipitation versus latitude
 
-transect_data = []
-
-for loc in transect_locations:
-  url = url = f"https://archive-api.open-meteo.com/v1/archive?latitude={loc['lat']}&longitude={loc['lon']}&start_date=2023-01-01&end_date=2023-12-31&daily=precipitation_sum&timezone=UTC"
-  res = requests.get(url).json()
+# Fetched once here; the dry-limit, drought and 2003/2023 passes reuse these series
+transect_points = [(loc['lat'], loc['lon']) for loc in transect_locations]
+transect_lats = np.array([loc['lat'] for loc in transect_locations])
+transect_precip_2023 = store.get_matrix(transect_points, 2023)
 
-  if 'daily' in res:
-    total_p = sum(res['daily']['precipitation_sum'])
-    transect_data.append({"Latitude": loc['lat'], "Precip": total_p})
+# Monthly sums, driest month and dry-month counts for every point in one pass
+transect_stats_2023 = summarize_precipitation(transect_precip_2023, year_dates(2023))
+transect_ok = transect_stats_2023['valid_days'] > 0 # Drop points that failed to fetch
 
-df_transect = pd.DataFrame(transect_data)
+df_transect = pd.DataFrame({
+  "Latitude": transect_lats[transect_ok],
+  "Precip": transect_stats_2023['annual_total'][transect_ok]
+})
 
 # Visualizing the change
 plt.figure(figsize=(10, 5))
@@ -138,30 +148,18 @@ plt.show()
 lats = np.linspace(0, -20, 10) 
 lons = np.linspace(-60, -60, 10) # Staying on the same longitude line
 
-transect_data = []
-
-for i in range(len(lats)):
-    url = f"https://archive-api.open-meteo.com/v1/archive?latitude={lats[i]}&longitude={lons[i]}&start_date=2023-01-01&end_date=2023-12-31&daily=precipitation_sum&timezone=UTC"
-    res = requests.get(url).json()
-    
-    if 'daily' in res:
-        precip_values = res['daily']['precipitation_sum']
-        total_p = sum(precip_values)
-        
-        # Calculate Seasonality (Coefficient of Variation)
-        # Higher values = more extreme dry/wet seasons
-        monthly_precip = [sum(precip_values[j:j+30]) for j in range(0, 360, 30)]
-        std_dev = np.std(monthly_precip)
-        mean_p = np.mean(monthly_precip)
-        seasonality = (std_dev / mean_p) * 100 if mean_p > 0 else 0
-        
-        transect_data.append({
-            "Latitude": lats[i], 
-            "Total_Precip": total_p, 
-            "Seasonality_Index": seasonality
-        })
-
-df_gradient = pd.DataFrame(transect_data)
+gradient_precip = store.get_matrix(zip(lats, lons), 2023)
+
+# Calculate Seasonality (Coefficient of Variation of calendar-month totals)
+# Higher values = more extreme dry/wet seasons
+gradient_stats = summarize_precipitation(gradient_precip, year_dates(2023))
+gradient_ok = gradient_stats['valid_days'] > 0
+
+df_gradient = pd.DataFrame({
+    "Latitude": lats[gradient_ok],
+    "Total_Precip": gradient_stats['annual_total'][gradient_ok],
+    "Seasonality_Index": gradient_stats['seasonality_index'][gradient_ok]
+})
 
 fig, ax1 = plt.subplots(figsize=(12, 6))
 
@@ -187,28 +185,14 @@ plt.show()
 # tropical ecosystems.
 #########################################################################################
 
-transect_data_drylimit = []
-
-for loc in transect_locations:
-  url = url = f"https://archive-api.open-meteo.com/v1/archive?latitude={loc['lat']}&longitude={loc['lon']}&start_date=2023-01-01&end_date=2023-12-31&daily=precipitation_sum&timezone=UTC"
-  res = requests.get(url).json()
-
-  if 'daily' in res:
-    precip_values = res['daily']['precipitation_sum']
-
-  # Group daily data into 12 months (roughly 30 days each)
-  monthly_totals = [sum(precip_values[i:i+30]) for i in range(0, 360, 30)]
-
-  driest_month_value = min(monthly_totals)
-  annual_total = sum(precip_values)
-
-  transect_data_drylimit.append({
-    "Latitude": loc['lat'],
-    "Annual_Precip": annual_total,
-    "Driest_Month_mm": driest_month_value
-  })
-
-df_drylimit = pd.DataFrame(transect_data_drylimit)
+# Same transect points as the first gradient: the calendar-month statistics
+# were already computed for every point (transect_stats_2023), no refetch
+df_drylimit = pd.DataFrame({
+  "Latitude": transect_lats[transect_ok],
+  "Annual_Precip": transect_stats_2023['annual_total'][transect_ok],
+  "Driest_Month": transect_stats_2023['driest_month'][transect_ok].astype(str),
+  "Driest_Month_mm": transect_stats_2023['driest_month_mm'][transect_ok]
+})
 
 plt.figure(figsize=(12, 6))
 
@@ -216,7 +200,7 @@ plt.figure(figsize=(12, 6))
 plt.plot(df_drylimit['Latitude'], df_drylimit['Driest_Month_mm'], marker='s', color='orange', label='Driest Month Rainfall')
 
 # Add the biological threshold line (60mm)
-plt.axhline(y=60, color='red', linestyle='--', label='Rainforest Threshold (60mm)')
+plt.axhline(y=DRY_MONTH_THRESHOLD, color='red', linestyle='--', label='Rainforest Threshold (60mm)')
 
 plt.title("The 'Dry Season' Barrier Across the Transect")
 plt.xlabel("Latitude (Equator to South)")
@@ -235,27 +219,11 @@ plt.legend()
 
 # Calculate drought duration
 
-drought_analysis = []
-
-for loc in transect_locations:
-    url = f"https://archive-api.open-meteo.com/v1/archive?latitude={loc['lat']}&longitude={loc['lon']}&start_date=2023-01-01&end_date=2023-12-31&daily=precipitation_sum&timezone=UTC"
-    res = requests.get(url).json()
-
-    if 'daily' in res:
-        precip_values = res['daily']['precipitation_sum']
-        
-        # Create 12 monthly totals
-        monthly_totals = [sum(precip_values[i:i+30]) for i in range(0, 360, 30)]
-        
-        # Count months where precipitation is less than 60mm
-        dry_months_count = sum(1 for month in monthly_totals if month < 60)
-
-        drought_analysis.append({
-            "Latitude": loc['lat'], 
-            "Dry_Months": dry_months_count
-        })
-
-df_drought = pd.DataFrame(drought_analysis)
+# Count calendar months where precipitation is less than 60mm
+df_drought = pd.DataFrame({
+    "Latitude": transect_lats[transect_ok],
+    "Dry_Months": transect_stats_2023['dry_months'][transect_ok]
+})
 
 # Visualize how many months of "biological stress" the vegetation faces as you move south
 
@@ -310,34 +278,20 @@ m
 #########################################################################################
 # Is it getting drier? Compare to 2003
 #########################################################################################
-comparison_data = []
-
-for loc in transect_locations:
-    # 1. Fetch 2003 Data
-    url_2003 = f"https://archive-api.open-meteo.com/v1/archive?latitude={loc['lat']}&longitude={loc['lon']}&start_date=2003-01-01&end_date=2003-12-31&daily=precipitation_sum&timezone=UTC"
-    res_2003 = requests.get(url_2003).json()
-    
-    # 2. Fetch 2023 Data (Re-running to ensure perfect alignment)
-    url_2023 = f"https://archive-api.open-meteo.com/v1/archive?latitude={loc['lat']}&longitude={loc['lon']}&start_date=2023-01-01&end_date=2023-12-31&daily=precipitation_sum&timezone=UTC"
-    res_2023 = requests.get(url_2023).json()
-
-    if 'daily' in res_2003 and 'daily' in res_2023:
-        # Calculate Dry Months for 2003
-        m_2003 = [sum(res_2003['daily']['precipitation_sum'][i:i+30]) for i in range(0, 360, 30)]
-        dry_2003 = sum(1 for m in m_2003 if m < 60)
-        
-        # Calculate Dry Months for 2023
-        m_2023 = [sum(res_2023['daily']['precipitation_sum'][i:i+30]) for i in range(0, 360, 30)]
-        dry_2023 = sum(1 for m in m_2023 if m < 60)
-
-        comparison_data.append({
-            "Latitude": round(loc['lat'], 2),
-            "Dry_Months_2003": dry_2003,
-            "Dry_Months_2023": dry_2023,
-            "Change": dry_2023 - dry_2003
-        })
-
-df_comp = pd.DataFrame(comparison_data)
+# 1. Fetch 2003 data in one concurrent batch; 2023 is already in the store
+transect_stats_2003 = summarize_precipitation(store.get_matrix(transect_points, 2003), year_dates(2003))
+both_ok = transect_ok & (transect_stats_2003['valid_days'] > 0)
+
+# 2. Dry months per year, already aggregated for every point
+dry_2003 = transect_stats_2003['dry_months'][both_ok]
+dry_2023 = transect_stats_2023['dry_months'][both_ok]
+
+df_comp = pd.DataFrame({
+    "Latitude": np.round(transect_lats[both_ok], 2),
+    "Dry_Months_2003": dry_2003,
+    "Dry_Months_2023": dry_2023,
+    "Change": dry_2023 - dry_2003
+})
 print(df_comp)
 
 # Visualize the shift through a grouped bar chart
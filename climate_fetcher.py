@@ -0,0 +1,117 @@
+"""
+File: climate_fetcher.py
+Description: Pooled, concurrent Open-Meteo archive fetcher for transects and location lists
+Library: requests (thread pool over one keep-alive session, via http_cache)
+"""
+
+import random
+import time
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from http_cache import OfflineCacheMiss, get_http_cache
+
+OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+# Status codes worth retrying (rate limiting and transient server errors)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Pool size of the HTTPS adapter this module mounted on each session
+# (sessions start with requests' default adapter of DEFAULT_POOLSIZE connections)
+_mounted_pool_sizes = weakref.WeakKeyDictionary()
+
+# One Open-Meteo daily request: variables is a str or a sequence of daily variables
+ClimateJob = namedtuple("ClimateJob", ["lat", "lon", "start_date", "end_date", "variables"])
+
+
+def year_job(lat, lon, year, variables="precipitation_sum"):
+    # Convenience: a full calendar year of daily data
+    return ClimateJob(float(lat), float(lon), f"{year}-01-01", f"{year}-12-31", variables)
+
+
+def _as_job(job):
+    # Accept plain tuples; lists of variables become tuples so jobs stay hashable
+    job = job if isinstance(job, ClimateJob) else ClimateJob(*job)
+    if not isinstance(job.variables, str):
+        job = job._replace(variables=tuple(job.variables))
+    return job
+
+
+def _job_params(job, timezone):
+    variables = job.variables if isinstance(job.variables, str) else ",".join(job.variables)
+    return {
+        "latitude": job.lat,
+        "longitude": job.lon,
+        "start_date": job.start_date,
+        "end_date": job.end_date,
+        "daily": variables,
+        "timezone": timezone
+    }
+
+
+def _fetch_one(cache, job, timezone, retries, backoff, timeout):
+    # Exponential backoff with jitter; returns the JSON payload or an
+    # Open-Meteo style {"error": True, "reason": ...} dict after the last attempt
+    params = _job_params(job, timezone)
+    reason = "no attempt made"
+
+    for attempt in range(retries + 1):
+        try:
+            response = cache.get(OPEN_METEO_ARCHIVE_URL, params=params, timeout=timeout)
+            if response.status_code == 200:
+                return response.json()
+            reason = f"HTTP {response.status_code}"
+            if response.status_code not in RETRY_STATUS:
+                break
+        except OfflineCacheMiss as e:
+            return {"error": True, "reason": str(e)} # Retrying cannot help offline
+        except (requests.RequestException, ValueError) as e:
+            reason = f"{type(e).__name__}: {e}"
+
+        if attempt < retries:
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+    return {"error": True, "reason": reason}
+
+
+def fetch_climate_job(job, retries=3, backoff=0.5, timezone="UTC", timeout=30, cache=None):
+    # One job on the calling thread (no worker pool); same retries and error dict
+    # as fetch_climate_jobs, for callers that already run their own threads
+    return _fetch_one(cache or get_http_cache(), _as_job(job), timezone, retries, backoff, timeout)
+
+
+def ensure_pool_size(session, pool_size):
+    # Grow the HTTPS connection pool to pool_size so concurrent sockets are reused;
+    # never shrinks it, and only re-mounts when growing to keep open connections alive
+    if _mounted_pool_sizes.get(session, DEFAULT_POOLSIZE) < pool_size:
+        session.mount("https://", HTTPAdapter(pool_maxsize=pool_size))
+        _mounted_pool_sizes[session] = pool_size
+
+
+def fetch_climate_jobs(jobs, max_workers=8, retries=3, backoff=0.5, timezone="UTC",
+                       timeout=30, cache=None):
+    """
+    Fetch many ClimateJobs concurrently (at most max_workers in flight) over one
+    pooled keep-alive session. Results come back in input order; duplicate jobs
+    are fetched once. Responses are stored in the shared http_cache.
+    """
+    jobs = [_as_job(j) for j in jobs]
+    if not jobs:
+        return []
+
+    cache = cache or get_http_cache()
+    ensure_pool_size(cache.session, max_workers)
+
+    unique_jobs = list(dict.fromkeys(jobs))
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_jobs))) as pool:
+        payloads = pool.map(
+            lambda job: _fetch_one(cache, job, timezone, retries, backoff, timeout),
+            unique_jobs
+        )
+        by_job = dict(zip(unique_jobs, payloads))
+
+    return [by_job[j] for j in jobs]
@@ -0,0 +1,157 @@
+"""
+File: climate_store.py
+Description: Single-fetch store of daily climate series keyed by (lat, lon, year, variable)
+             held as compact float32 arrays in memory and on disk
+Library: numpy (+ climate_fetcher for anything not stored yet)
+"""
+
+import os
+import time
+
+import numpy as np
+
+from climate_fetcher import fetch_climate_jobs, year_job
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "PALEO_CLIMATE_STORE",
+    os.path.join(os.path.expanduser("~"), ".paleo_cache", "climate_store")
+)
+DEFAULT_VARIABLE = "precipitation_sum"
+# Seconds a failed point-year is skipped before it is requested again
+FAILURE_TTL = float(os.environ.get("PALEO_CLIMATE_RETRY_AFTER", 600))
+
+
+def year_dates(year, n_days=None):
+    # Daily date index for a calendar year (optionally truncated to n_days)
+    dates = np.arange(f"{year}-01-01", f"{int(year) + 1}-01-01", dtype="datetime64[D]")
+    return dates if n_days is None else dates[:n_days]
+
+
+class ClimateRecordStore:
+    """
+    Daily series cache: memory first, then .npy files on disk, then one concurrent
+    Open-Meteo batch for everything still missing. Missing days are stored as NaN.
+    Failed fetches are remembered (in memory) and not retried for failure_ttl seconds.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, precision=4, fetcher=fetch_climate_jobs,
+                 failure_ttl=FAILURE_TTL):
+        # root=None keeps the store in memory only
+        self.root = root
+        self.precision = precision
+        self.fetcher = fetcher
+        self.failure_ttl = failure_ttl
+        self._memory = {}
+        self._failed = {} # key -> time.monotonic() of the failed fetch
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "fetched": 0, "failed": 0,
+                      "skipped_failed": 0}
+
+    def key(self, lat, lon, year, variable=DEFAULT_VARIABLE):
+        # Rounded coordinates so 1e-12 float noise doesn't create duplicate entries
+        return (round(float(lat), self.precision), round(float(lon), self.precision),
+                int(year), variable)
+
+    def _path(self, key):
+        lat, lon, year, variable = key
+        return os.path.join(self.root, variable, str(year), f"{lat:+.{self.precision}f}_{lon:+.{self.precision}f}.npy")
+
+    def _load(self, key):
+        # Memory, then disk; None if the series has never been fetched
+        if key in self._memory:
+            self.stats["memory_hits"] += 1
+            return self._memory[key]
+
+        if self.root and os.path.exists(self._path(key)):
+            series = np.load(self._path(key))
+            self._memory[key] = series
+            self.stats["disk_hits"] += 1
+            return series
+        return None
+
+    def _recently_failed(self, key):
+        failed_at = self._failed.get(key)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at >= self.failure_ttl:
+            del self._failed[key] # Expired: try the request again
+            return False
+        self.stats["skipped_failed"] += 1
+        return True
+
+    def _save(self, key, values):
+        # None (missing day) -> NaN, then compact float32
+        series = np.array([np.nan if v is None else v for v in values], dtype=np.float32)
+        self._memory[key] = series
+
+        if self.root:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp.npy"
+            np.save(tmp_path, series)
+            os.replace(tmp_path, path)
+        return series
+
+    def prefetch(self, points, years, variables=(DEFAULT_VARIABLE,)):
+        # Make sure every (point, year, variable) is stored; all misses go out as
+        # one batch with one request per point-year covering all missing variables
+        years = [years] if np.isscalar(years) else list(years)
+        variables = [variables] if isinstance(variables, str) else list(variables)
+
+        wanted = {}
+        for lat, lon in points:
+            for year in years:
+                missing = tuple(v for v in variables
+                                if self._load(self.key(lat, lon, year, v)) is None
+                                and not self._recently_failed(self.key(lat, lon, year, v)))
+                if missing:
+                    lat_r, lon_r, year_i, _ = self.key(lat, lon, year)
+                    wanted[(lat_r, lon_r, year_i)] = missing
+
+        if not wanted:
+            return
+
+        jobs = [year_job(lat, lon, year, missing) for (lat, lon, year), missing in wanted.items()]
+        for payload, ((lat, lon, year), missing) in zip(self.fetcher(jobs), wanted.items()):
+            daily = payload.get("daily", {}) if isinstance(payload, dict) else {}
+            for variable in missing:
+                if variable in daily:
+                    self._save((lat, lon, year, variable), daily[variable])
+                    self.stats["fetched"] += 1
+                else:
+                    self._failed[(lat, lon, year, variable)] = time.monotonic()
+                    self.stats["failed"] += 1
+
+    def get_series(self, lat, lon, year, variable=DEFAULT_VARIABLE):
+        # One daily float32 series, or None if it could not be fetched
+        key = self.key(lat, lon, year, variable)
+        series = self._load(key)
+        if series is None:
+            self.prefetch([(lat, lon)], year, variable)
+            series = self._memory.get(key)
+        return series
+
+    def get_matrix(self, points, year, variable=DEFAULT_VARIABLE):
+        """
+        (n_points x n_days) float32 matrix for one year, rows in input order.
+        Points that could not be fetched are all-NaN rows.
+        """
+        points = [(float(lat), float(lon)) for lat, lon in points]
+        self.prefetch(points, year, variable)
+
+        n_days = len(year_dates(year))
+        matrix = np.full((len(points), n_days), np.nan, dtype=np.float32)
+        for i, (lat, lon) in enumerate(points):
+            series = self._memory.get(self.key(lat, lon, year, variable))
+            if series is not None:
+                matrix[i, :len(series)] = series[:n_days]
+        return matrix
+
+
+_default_store = None
+
+def get_climate_store():
+    # Session-wide store, so each point-year is fetched at most once per session
+    global _default_store
+    if _default_store is None:
+        _default_store = ClimateRecordStore()
+    return _default_store
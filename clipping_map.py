@@ -4,6 +4,10 @@ import rioxarray
 #!pip install geemap
 import geemap
 
+import matplotlib.pyplot as plt
+
+from raster_access import read_bbox
+
 # geemap has a sample cloud optimized GeoTIFF (COG) that can be used to practice spatial logic
 
 url = 'https://github.com/giswqs/data/raw/main/raster/srtm90.tif' 
@@ -12,8 +16,6 @@ url = 'https://github.com/giswqs/data/raw/main/raster/srtm90.tif'
 # finds the coordinate reference system (CRS), cell size, and "No Data" values
 # the output is a 3D object with dimensions (band, y, x)
 
-data = rioxarray.open_rasterio(url)
-
 # Treat this 'elevation' data as a proxy for a Bioclim variable (like BIO1)
 # to build an analysis pipeline.
 
@@ -22,8 +24,10 @@ data = rioxarray.open_rasterio(url)
 min_lon, max_lon = -120.0, -110.0
 min_lat, max_lat = 35.0, 45.0
 
-# Use .rio.clip_box() to clip the data to a bounding box set by min_lon, max_lon, min_lat, and max_lat
-clipped_data = data.rio.clip_box(
+# read_bbox opens the COG lazily and clips it with .rio.clip_box() to the bounding box set by
+# min_lon, max_lon, min_lat, and max_lat, so only the tiles inside the box are downloaded
+clipped_data = read_bbox(
+    url,
     minx=min_lon,
     miny=min_lat,
     maxx=max_lon,
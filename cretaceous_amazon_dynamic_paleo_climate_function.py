@@ -33,14 +33,22 @@ import chronos
 # !pip install geopy
 
 import requests
-from geopy.geocoders import Nominatim
+from gazetteer import get_gazetteer
+
+# Every remote call goes through the shared on-disk response cache
+# (set PALEO_HTTP_OFFLINE=1 to replay recorded responses with no network)
+from http_cache import cached_get
+
+# Point reconstruction in-process from the model's rotation files by default
+# (set PALEO_RECON_BACKEND=remote to use gws.gplates.org instead)
+from reconstruction_service import reconstruct_point
 
 def get_coordinates(location_name):
   # Fetches modern lat/lon for a given string location.
-  geolocator = Nominatim(user_agent="paleo_explorer")
-  location = geolocator.geocode(location_name)
+  # Local gazetteer and on-disk geocoder cache first, Nominatim only on a miss.
+  location = get_gazetteer().geocode(location_name)
   if location:
-    return location.latitude, location.longitude
+    return location.lat, location.lon
   else:
     return None, None
     
@@ -52,16 +60,8 @@ def get_paleo_location(location_name, age):
   if lat is None:
     return f"Location '{location_name}' not found."
   
-  # 2. call the official GPlates engine directly
-  url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-  params = {
-    "points": f"{lon},{lat}",
-    "time": age,
-    "model": "MULLER2016"
-  }
-  
-  data = requests.get(url, params=params).json()
-  p_lon, p_lat = data['coordinates'][0]
+  # 2. Rotate the point with the GPlates reconstruction service (local or remote)
+  p_lon, p_lat = reconstruct_point(lon, lat, age, model="MULLER2016")
   
 
   # 100 million years ago Amazon
@@ -99,7 +99,7 @@ def get_modern_climate(lat, lon):
     }
 
     # Added verify=False to ignore the SSL UNRECOGNIZED_NAME error
-    response = requests.get(url, params=params, verify=False)
+    response = cached_get(url, params=params, verify=False)
     
     if response.status_code != 200:
         print(f"Weather API Error: {response.status_code}")
@@ -153,17 +153,10 @@ def climate_paleo_data(lat, lon, age):
   real_modern_avg = get_modern_temp(lat, lon)
   
   # 2. Rotate the point to find its ancient paleo-coordinates
-  gplates_url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-  g_params = {"points": f"{lon},{lat}", "time": age, "model": "MULLER2016"}
-  
-  response = requests.get(gplates_url, params = g_params)
-
-  # Check if the request was successful
-  if response.status_code != 200:
-    return f"Error: Server returned status {response.status_code}"
-  
-  g_data = requests.get(gplates_url, params=g_params).json()
-  p_lon, p_lat = g_data['coordinates'][0]
+  try:
+    p_lon, p_lat = reconstruct_point(lon, lat, age, model="MULLER2016")
+  except Exception as e:
+    return f"Error: Reconstruction failed ({e})"
 
   # Estimate Paleo-Temperature (Based on Cretaceous Model Grids)
   # In a full research environment, you'd query a NetCDF file here
@@ -303,19 +296,11 @@ plt.show()
 
 import math
 
-def calculate_velocity(lat1, lon1, lat2, lon2, years):
-  # Radius of Earth in kilometers
-  R = 6371.0
-
-  # Convert degrees to radians
-  phi1, phi2 = math.radians(lat1), math.radians(lat2)
-  dphi = math.radians(lat2 - lat1)
-  dlambda = math.radians(lon2 - lon1)
+from geodesy import haversine
 
-  # Haversine formula
-  a = math.sin(dphi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2)**2
-  c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-  distance_km = R * c
+def calculate_velocity(lat1, lon1, lat2, lon2, years):
+  # Haversine distance in kilometers (geodesy.py; also accepts arrays of points)
+  distance_km = haversine(lat1, lon1, lat2, lon2)
 
   # Convert to centimeters (1 km = 100,000 cm)
   distance_cm = distance_km * 100000
@@ -336,30 +321,17 @@ print(f"Average Drift Speed: {round(speed, 2)} cm/year")
 # geological eras.
 #########################################################################################
 
+from paleo_temperature_curve import GLOBAL_GMT_CURVE
+from paleolat_grid import get_paleolat_grid
+
 def get_global_paleo_temp(age):
 
   # Returns the estimated global mean temperature (GMT) for a given age (Ma).
   # Based on the Veizer et al. and Westerhold et al. climate curves.
 
-  # Simplified look-up for major climate states.
-  # Age: GMT in Celsius
-  climate_history = [
-      (0, 15.0),      # Modern
-      (3, 19.0),       # Pliocene
-      (50, 28.0),     # Eocene Hothouse
-      (66, 23.0),     # K-Pg Boundary
-      (100, 25.0),    # Mid-Cretaceous (Our target)
-      (150, 22.0),    # Permian-Triassic
-      (360, 14.0),    # Carboniferous (Icehouse)
-      (500, 22.0)     # Cambrian
-  ]
-
-  # Sort and interpolate to get a smooth value for any 'age'
-  ages = [x[0] for x in climate_history]
-  temps = [x[1] for x in climate_history]
-
-  # Use numpy to interpolate the temperature for the specific age
-  return float(np.interp(age, ages, temps))
+  # The look-up table (GLOBAL_GMT_HISTORY) lives in paleo_temperature_curve.py and is
+  # sorted into NumPy arrays once; 'age' may be a scalar or an array.
+  return GLOBAL_GMT_CURVE(age)
 
 def climate_paleo_data_v3(lat, lon, age):
   # 1. Get modern local MAT
@@ -376,10 +348,13 @@ def climate_paleo_data_v3(lat, lon, age):
   # Greenhouse warming is not uniform: it's stronger at poles and weaker at equator
   # We find the paleo-latitude first
 
-  url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-  params = {"point": f"{lon},{lat}", "time": age, "model": "MULLER2016"}
-  g_data = requests.get(url, params=params, verify=False).json()
-  p_lat = g_data['coordinates'][0][1]
+  # Prebuilt paleo-latitude grid if one exists for this model (paleolat_grid.py),
+  # exact point reconstruction otherwise
+  grid = get_paleolat_grid("MULLER2016")
+  if grid is not None and grid.covers(age):
+    p_lat = grid.paleo_lat(lat, lon, age)
+  else:
+    p_lon, p_lat = reconstruct_point(lon, lat, age, model="MULLER2016")
 
   # Polar Amplification Factor:
   # High latitudes feel the global delta more than the equator
@@ -414,12 +389,8 @@ def check_paleo_elevation(lat, lon, age):
 
   # 1. Standard GPlates Reconstruction to get Paleo-latitude/Paleo-longitude
 
-  url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-  params = {"points": f"{lon},{lat}", "time": age, "model": "MULLER2016"}
-
   try:
-      data = requests.get(url, params=params, verify=False).json()
-      p_lon, p_lat = data['coordinates'][0]
+      p_lon, p_lat = reconstruct_point(lon, lat, age, model="MULLER2016")
 
       # 2. Query Macrostat/GPlates for Paleogeography
       # We check if the point falls within a 'marine' or 'terrestrial' polygon
@@ -432,7 +403,7 @@ def check_paleo_elevation(lat, lon, age):
       "layer": "paleogeography" # Specific GPlates layer for land/sea masks
       }
 
-      pg_response = requests.get(pg_url, params=pg_params, verify=False).json()
+      pg_response = cached_get(pg_url, params=pg_params, verify=False).json()
 
       # Logic: If no feature is returned, it's often deep ocean.
       # If a feature is reutrned, we check the 'environment' attribute.
@@ -467,14 +438,20 @@ else:
 # level adjustment can be used instead.
 ##########################################################################################
 
+# Local DEM sampling (set PALEO_ELEVATION_RASTER to an SRTM/GMTED GeoTIFF or COG);
+# without one, elevations still come from the open elevation API
+from raster_sampling import local_elevation
+
 def check_submersion_risk(mod_lat, mod_lon, age):
-    # 1. Get Modern Elevation using a simple open elevation API
-    elev_url = f"https://api.open-elevation.com/api/v1/lookup?locations={mod_lat},{mod_lon}"
-    try:
-        elev_data = requests.get(elev_url).json()
-        modern_elev = elev_data['results'][0]['elevation']
-    except:
-        modern_elev = 50 # Default for low-lying Amazon basin
+    # 1. Get Modern Elevation from the local DEM, or else a simple open elevation API
+    modern_elev = local_elevation(mod_lat, mod_lon)
+    if modern_elev is None or math.isnan(modern_elev):
+        elev_url = f"https://api.open-elevation.com/api/v1/lookup?locations={mod_lat},{mod_lon}"
+        try:
+            elev_data = cached_get(elev_url).json()
+            modern_elev = elev_data['results'][0]['elevation']
+        except:
+            modern_elev = 50 # Default for low-lying Amazon basin
 
     # 2. Define Cretaceous Sea Level Rise (Eustatic)
     # The Mid-Cretaceous was the "high-water mark" of the Phanerozoic
@@ -505,8 +482,13 @@ print(f"Result: {elevation_report['status']}")
 # tolerance against a theropod's biology.
 ########################################################################################
 
+from habitability import fossil_list_from_records, score_site
+# Fossil queries are answered locally once a PBDB dump has been imported
+# (pbdb_index.import_pbdb_dump); otherwise they go to paleobiodb.org
+from pbdb_index import get_pbdb_index
+
 def get_habitability_report():
-  geolocator = Nominatim(user_agent="paleo_explorer_v4")
+  gazetteer = get_gazetteer()
 
   while True:
     print("\n" + "="*40)
@@ -519,11 +501,11 @@ def get_habitability_report():
 
     # 1. Validate Location & Get Coordinates
     try:
-        loc = geolocator.geocode(location_name)
+        loc = gazetteer.geocode(location_name)
         if not loc:
           print("f❌ '{location_name}' not recognized. Please try a city, country, or landmark.")
           continue
-        lat, lon = loc.latitude, loc.longitude
+        lat, lon = loc.lat, loc.lon
     except Exception as e:
         print(f"Connection error: {e}. Please try again.")
         continue
@@ -535,49 +517,24 @@ def get_habitability_report():
     modern_temp, modern_precip = get_modern_climate(lat, lon)
 
     # 3. Get Modern Elevation (defined once, dynamic Input for bathymetry and biome)
-    try:
-        elev_url = f"https://api.open-elevation.com/api/v1/lookup?locations={lat},{lon}"
-        elev_res = requests.get(elev_url, timeout=3).json()
-        modern_elevation = elev_res['results'][0]['elevation']
-    except:
-        modern_elevation = 0 # Default average
+    modern_elevation = local_elevation(lat, lon)
+    if modern_elevation is None or math.isnan(modern_elevation):
+        try:
+            elev_url = f"https://api.open-elevation.com/api/v1/lookup?locations={lat},{lon}"
+            elev_res = cached_get(elev_url, timeout=3).json()
+            modern_elevation = elev_res['results'][0]['elevation']
+        except:
+            modern_elevation = 0 # Default average
 
     # 4. Tectonic Reconstruction
 
     try:
-        g_url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-        g_params = {"points": f"{lon},{lat}", "time": target_age, "model": "MULLER2016"}
-        g_data = requests.get(g_url, params=g_params).json()
-        p_lon, p_lat = g_data['coordinates'][0]
+        p_lon, p_lat = reconstruct_point(lon, lat, target_age, model="MULLER2016")
     except:
-        print("Error connecting to GPlates server. Skipping tectonic check.")
+        print("Error reconstructing with GPlates. Skipping tectonic check.")
         continue
 
-    # 5. Dynamic Global Bathymetry Calculation
-    # Eustatic rise + thermal expansion (warm water expands)
-    eustatic_rise = 250
-    thermal_expansion = 15 * (1.0 - (abs(p_lat) / 90))
-
-    # Loading factor: Low-lying basins (like the Gulf) sink more under water weight
-    loading_factor = 1.33 if modern_elevation < 150 else 1.0
-
-    # Net paleo-Depth (if > 0, the location is submerged)
-    net_depth = (eustatic_rise + thermal_expansion) - (modern_elevation * loading_factor)
-    is_submerged = net_depth > 0
-  
-    # 6. Calculate paleo-temperature
-    # Check if point was submerged to adjust the "Hothouse Delta"
-    
-    global_delta = 10.0
-    amplitude = 1.0 - (0.5 *math.cos(math.radians(p_lat)))
-    local_delta = global_delta * amplitude
-
-    # Apply cooling if submerged, heating if land
-    local_delta *= 0.65 if is_submerged else 1.2
-    modern_baseline = 15 + (12 * math.cos(math.radians(lat)))
-    paleo_temp = round(modern_baseline + local_delta, 2)
-
-    # 7. Paleobiology database (PBDB) querying actual fossil records.
+    # 5. Paleobiology database (PBDB) querying actual fossil records.
     # This turns the code from a predictive model to verifiable to actual data.
     
     pbdb_url = "https://paleobiodb.org/data1.2/occs/list.json"
@@ -589,87 +546,35 @@ def get_habitability_report():
 
     fossil_list = []
     try:
-        # verify=False handles the SSL issues encountered earlier
-        response = requests.get(pbdb_url, params=pbdb_params, verify=False, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json().get('records', [])
-            for r in data:
-                # In standard v1.2 (without 'vocab'), the keys are 'tna' and 'cll'
-                name, t_class = r.get('tna'), r.get('cll', 'Unknown')
-                #t_class = r.get('cll', 'Unknown')
-                if name and name not in fossil_list:
-                    fossil_list.append(f"{name} ({t_class})")
-            
-            fossil_list = fossil_list[:5]
+        pbdb_index = get_pbdb_index()
+        if pbdb_index is not None:
+            # Local occurrence index (see pbdb_index.py): same records, no request
+            data = pbdb_index.records(pbdb_params)
         else:
-            print(f"DEBUG: Status {response.status_code}, Response: {response.text}")
-            
+            # verify=False handles the SSL issues encountered earlier
+            response = cached_get(pbdb_url, params=pbdb_params, verify=False, timeout=10)
+            data = []
+            if response.status_code == 200:
+                data = response.json().get('records', [])
+            else:
+                print(f"DEBUG: Status {response.status_code}, Response: {response.text}")
+
+        fossil_list = fossil_list_from_records(data)
+
     except Exception as e:
         fossil_list = [f"Connection error: {e}"]
     
 
-    # 8. Biome override logic
-    
-    # Check if the fossils found suggest a marine environment
-    # Define taxonomic indicators
-    # Marine Specialists (cannot exist on land)
-    
-    deep_marine_taxa = ['Platecarpus', 'Mosasaur', 'Plesiosaur', 'Ichthyornis', 'Hesperornis', 'Xiphactinus', \
-                        'Cephalopoda', 'Ammonite', 'Toxochelys']
-    shallow_marine_taxa = ['Bivalvia', 'Acutostrea', 'Agerostrea', 'Oyster', 'Gastropoda', 'Anthozoa']
-
-    # Land Specialists 
-    land_taxa = ['Anklyosaur', 'Hadrosaur', 'Tyrannosaur', 'Certopsid', 'Ornithischia', 'Lycopodiopsida' \
-                 'Pteridopsida', 'Anthozoa']
-
-    # Evaluate fossil evidence
-
-    fossil_str = str(fossil_list)
-    has_deep = any(x.lower() in fossil_str.lower() for x in deep_marine_taxa)
-    has_shallow = any(x.lower() in fossil_str.lower() for x in shallow_marine_taxa)
-    has_land = any(x.lower() in fossil_str.lower() for x in land_taxa)
+    # 6. Bathymetry, paleo-temperature, biome override and habitability scoring
+    # (shared with the batch pipeline in habitability_pipeline.py)
+    report = score_site(lat, modern_elevation, p_lat, fossil_list)
+    is_submerged, has_deep = report["is_submerged"], report["has_deep"]
+    paleo_temp = report["paleo_temp"]
+    env_label, depth_label = report["env_label"], report["depth_label"]
+    experience = report["experience"]
+    human_score, dino_score = report["human_score"], report["dino_score"]
 
-    # Environment and Depth Synthesis 
-
-    if has_deep:
-        env_label = "🌊 Deep Marine (Fossil Override)"
-        depth_label = f"{round(max(net_depth, 100))}m"
-        experience = "You are treading water in a vast seaway. Apex predators are circling below."
-
-    elif is_submerged and not has_land:
-        env_label = "🌊 Submerged Continental Shelf (Dynamic Model)"
-        depth_label = f"{round(net_depth)}m"
-        experience = "Though the plate is continental, high sea levels have flooded this region."
-
-    elif is_submerged and has_land:
-        env_label = "🌊 Coastal Marine (Bloat & Float Zone)"
-        depth_label = f"{round(net_depth)}m"
-        experience = "You are in shallow water. Land is nearby, as land fossils are present."
-
-    else:
-        env_label = "🌋 Terrestrial/Inland"
-        depth_label = "N/A"
-        experience = "You're on firm ground in a humid Cretaceous world."
-  
-
-    # 9. Habitability Scoring
-    # Human: optimal at 22°C. Drastic drop after 35°C (wet bulb/heat stroke limits).
-    human_score = max(0, min(100, 100 - (abs(paleo_temp - 22) ** 1.5) * 2))
-
-    # Dinosaur: optimal at 32°C. Large theropods handled heat better than cold.
-    dino_score = max(0, min(100, 100 - (abs(paleo_temp - 32) ** 1.3) * 2))
-
-    # Adjust scores: being in deep water lower human habitability significantly
-    if is_submerged:
-       human_score = 10
-
-    if has_deep:
-       human_score = 10
-       dino_score = 60
-      
-    
-    # 10. Display Results
+    # 7. Display Results
     print(f"\n --- 100 Ma Report: {location_name.upper()} ---")
     print(f"Modern Stats:   {round(lat,2)}, {round(lon,2)}) | Elev: {modern_elevation}m")
     print(f"Paleo-Coordinates:    {round(p_lat,2)},{round(p_lon,2)} ({'N' if p_lat > 0 else 'S'})")
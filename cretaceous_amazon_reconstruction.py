@@ -33,14 +33,22 @@ import chronos
 # !pip install geopy
 
 import requests
-from geopy.geocoders import Nominatim
+from gazetteer import get_gazetteer
+
+# Every remote call goes through the shared on-disk response cache
+# (set PALEO_HTTP_OFFLINE=1 to replay recorded responses with no network)
+from http_cache import cached_get
+
+# Point reconstruction in-process from the model's rotation files by default
+# (set PALEO_RECON_BACKEND=remote to use gws.gplates.org instead)
+from reconstruction_service import reconstruct_point
 
 def get_coordinates(location_name):
   # Fetches modern lat/lon for a given string location.
-  geolocator = Nominatim(user_agent="paleo_explorer")
-  location = geolocator.geocode(location_name)
+  # Local gazetteer and on-disk geocoder cache first, Nominatim only on a miss.
+  location = get_gazetteer().geocode(location_name)
   if location:
-    return location.latitude, location.longitude
+    return location.lat, location.lon
   else:
     return None, None
     
@@ -52,16 +60,8 @@ def get_paleo_location(location_name, age):
   if lat is None:
     return f"Location '{location_name}' not found."
   
-  # 2. call the official GPlates engine directly
-  url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-  params = {
-    "points": f"{lon},{lat}",
-    "time": age,
-    "model": "MULLER2016"
-  }
-  
-  data = requests.get(url, params=params).json()
-  p_lon, p_lat = data['coordinates'][0]
+  # 2. Rotate the point with the GPlates reconstruction service (local or remote)
+  p_lon, p_lat = reconstruct_point(lon, lat, age, model="MULLER2016")
   
 
   # 100 million years ago Amazon
@@ -99,7 +99,7 @@ def get_modern_temp(lat, lon):
     }
 
     # Added verify=False to ignore the SSL UNRECOGNIZED_NAME error
-    response = requests.get(url, params=params, verify=False)
+    response = cached_get(url, params=params, verify=False)
     
     if response.status_code != 200:
         print(f"Weather API Error: {response.status_code}")
@@ -147,17 +147,10 @@ def climate_paleo_data(lat, lon, age):
   real_modern_avg = get_modern_temp(lat, lon)
   
   # 2. Rotate the point to find its ancient paleo-coordinates
-  gplates_url = "https://gws.gplates.org/reconstruct/reconstruct_points/"
-  g_params = {"points": f"{lon},{lat}", "time": age, "model": "MULLER2016"}
-  
-  response = requests.get(gplates_url, params = g_params)
-
-  # Check if the request was successful
-  if response.status_code != 200:
-    return f"Error: Server returned status {response.status_code}"
-  
-  g_data = requests.get(gplates_url, params=g_params).json()
-  p_lon, p_lat = g_data['coordinates'][0]
+  try:
+    p_lon, p_lat = reconstruct_point(lon, lat, age, model="MULLER2016")
+  except Exception as e:
+    return f"Error: Reconstruction failed ({e})"
 
   # Estimate Paleo-Temperature (Based on Cretaceous Model Grids)
   # In a full research environment, you'd query a NetCDF file here
@@ -291,19 +284,11 @@ plt.show()
 
 import math
 
+from geodesy import haversine
+
 def calculate_velocity(lat1, lon1, lat2, lon2, years):
-  # Radius of Earth in kilometers
-  R = 6371.0
-
-  # Convert degrees to radians
-  phi1, phi2 = math.radians(lat1), math.radians(lat2)
-  dphi = math.radians(lat2 - lat1)
-  dlambda = math.radians(lon2 - lon1)
-
-  # Haversine formula
-  a = math.sin(dphi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2)**2
-  c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-  distance_km = R * c
+  # Haversine distance in kilometers (geodesy.py; also accepts arrays of points)
+  distance_km = haversine(lat1, lon1, lat2, lon2)
 
   # Convert to centimeters (1 km = 100,000 cm)
   distance_cm = distance_km * 100000
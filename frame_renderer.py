@@ -0,0 +1,119 @@
+"""
+File: frame_renderer.py
+Description: One reusable figure per animation. The projection, ocean background and
+             frame are drawn once and cached as a blitted bitmap; each time step only
+             redraws what changes (continents, coastlines, trail, marker, text).
+Library: matplotlib (Agg) + cartopy (+ geometry_cache for the reconstructed layers)
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import cartopy.crs as ccrs
+
+# Reconstructed continents/coastlines per (model, time), cached on disk
+from geometry_cache import get_geometry_cache, plot_layer
+
+# Figure layouts used by the two animation scripts
+RENDER_STYLES = {
+    # global_deep_time_location_tracker.py
+    "tracker": {"projection": ccrs.Robinson, "figsize": (12, 7), "suptitle": True},
+    # plate_tectonics_animation.py
+    "animation": {"projection": ccrs.Mollweide, "figsize": (10, 5), "suptitle": False},
+}
+
+
+class AnimationFrameRenderer:
+    """
+    renderer = AnimationFrameRenderer(plate_model, RENDER_STYLES["tracker"])
+    frame = renderer.render(spec)   # (height, width, 4) uint8, same size every frame
+
+    spec is any object with time, title, caption, label, marker and trail fields
+    (see parallel_render.FrameSpec).
+    """
+
+    def __init__(self, plate_model, style, dpi=100, geometry_cache=None):
+        self.plate_model = plate_model
+        self.style = style
+        self.geometry_cache = geometry_cache or get_geometry_cache()
+
+        # 1. Figure, projection and static background (built once)
+        self.fig = plt.figure(figsize=style["figsize"], dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(1, 1, 1, projection=style["projection"]())
+        self.ax.set_global()
+        self.ax.set_facecolor('#f0f8ff')
+
+        # 2. Dynamic artists, created empty and excluded from the background draw
+        self.trail, = self.ax.plot([], [], color='blue', linewidth=1.5, linestyle='--',
+                                   transform=ccrs.PlateCarree(), alpha=0.5, animated=True)
+        self.marker, = self.ax.plot([], [], 'ro', markersize=10, transform=ccrs.PlateCarree(),
+                                    markeredgecolor='white', zorder=10, animated=True)
+        if style["suptitle"]:
+            self.title = self.fig.suptitle("", fontsize=16, color='black',
+                                           fontweight='bold', y=0.95)
+        else:
+            self.title = self.ax.set_title("")
+        self.title.set_animated(True)
+        self.caption = self.ax.text(0.5, -0.05, "", transform=self.ax.transAxes,
+                                    color='black', ha='center', fontsize=12,
+                                    fontweight='bold', animated=True)
+        self.label = self.ax.text(0.5, 0.05, "", transform=self.ax.transAxes, color='white',
+                                  ha='center', fontsize=16, animated=True,
+                                  bbox=dict(facecolor='red', alpha=0.5))
+        self._geography = []
+
+        # 3. Draw once and keep the static layer as a bitmap
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _update_geography(self, time):
+        # Replace last frame's continents/coastlines with this time step's,
+        # read from the geometry cache (reconstructed once per model/time)
+        for artist in self._geography:
+            artist.remove()
+
+        layers = self.geometry_cache.get_layers(self.plate_model, time,
+                                                layers=("continents", "coastlines"))
+        self._geography = (
+            plot_layer(self.ax, layers["continents"], facecolor='#e6ccb2', alpha=0.9)
+            + plot_layer(self.ax, layers["coastlines"], edgecolor='#222222', linewidth=0.5)
+        )
+        for artist in self._geography:
+            artist.set_animated(True)
+
+    def render(self, spec):
+        # Restore the cached background, draw only the dynamic artists, return RGBA
+        self._update_geography(spec.time)
+
+        if spec.trail is not None and len(spec.trail[0]) > 1:
+            self.trail.set_data(spec.trail[1], spec.trail[0])
+        else:
+            self.trail.set_data([], [])
+        if spec.marker is not None:
+            self.marker.set_data([spec.marker[1]], [spec.marker[0]])
+        else:
+            self.marker.set_data([], [])
+        self.title.set_text(spec.title or "")
+        self.caption.set_text(spec.caption or "")
+        self.label.set_text(spec.label or "")
+        self.label.set_visible(bool(spec.label))
+
+        self.canvas.restore_region(self._background)
+        # Geography first (below the trail/marker), then overlays in zorder
+        for artist in sorted(self._geography, key=lambda a: a.get_zorder()):
+            self.ax.draw_artist(artist)
+        for artist in (self.trail, self.marker, self.caption, self.label):
+            self.ax.draw_artist(artist)
+        self.fig.draw_artist(self.title)
+
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+
+    def save(self, spec, path):
+        # Render one frame to a PNG (full figure size, identical to the video frames)
+        plt.imsave(path, self.render(spec))
+        return path
+
+    def close(self):
+        plt.close(self.fig)
@@ -0,0 +1,292 @@
+"""
+File: gazetteer.py
+Description: Offline place-name lookup with a persistent cache of geocoder answers
+Library: numpy (geopy only when a name misses the local table and cache)
+"""
+
+import bisect
+import csv
+import difflib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+from geodesy import haversine
+
+# Persistent cache of every geocoder answer (including "not found")
+DEFAULT_CACHE_PATH = os.environ.get(
+    "PALEO_GAZETTEER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".paleo_cache", "geocoder_cache.json")
+)
+
+# Optional bulk place-name file loaded by get_gazetteer() (GeoNames dump or CSV)
+DEFAULT_PLACES_FILE = os.environ.get("PALEO_GAZETTEER_FILE")
+
+# Set PALEO_GEOCODER_OFFLINE=1 on air-gapped nodes to never touch Nominatim
+OFFLINE = os.environ.get("PALEO_GEOCODER_OFFLINE", "0") == "1"
+
+# Minimum seconds between Nominatim requests (usage policy: 1 request/s)
+GEOCODER_MIN_INTERVAL = 1.0
+
+# Common city coordinates, always available without a network
+# (previously the city_db in tecto_bioclimate_engine.py)
+SEED_PLACES = [
+    ("New York, NY", 40.71, -74.01),
+    ("London, UK", 51.51, -0.13),
+    ("Sydney, AU", -33.87, 151.21),
+    ("Syndney, AU", -33.87, 151.21), # Spelling used by older notebooks
+    ("Lagos, NG", 6.45, 3.38),
+    ("Buenos Aires, AR", -34.60, -58.38),
+]
+
+GeocodeResult = namedtuple("GeocodeResult", ["lat", "lon", "source", "matched_name"])
+
+
+def normalize_place_name(name):
+    # "São Paulo,  BR" -> "sao paulo br": strip accents, case and punctuation
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+class Gazetteer:
+    """
+    Place-name table with a normalized-name hash index, a sorted prefix index for
+    fuzzy matches and a lat-sorted coordinate array for nearest-place queries.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, offline=OFFLINE):
+        self.cache_path = cache_path
+        self.offline = offline
+
+        self._names, self._lats, self._lons, self._populations = [], [], [], []
+        self._index = {}           # normalized name -> row
+        self._prefix_keys = None   # sorted normalized names (built lazily)
+        self._spatial = None       # lat-sorted coordinate arrays (built lazily)
+        self._geolocator = None
+        self._geocoder_lock = threading.Lock()
+        self._next_request = 0.0   # time.monotonic() of the next allowed request
+
+        self._cache = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path) as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {} # Corrupt cache: start fresh, it is rebuilt on demand
+
+    def __len__(self):
+        return len(self._names)
+
+    # --- Bulk loading ---
+
+    def add_places(self, rows):
+        # rows: iterable of (name, lat, lon) or (name, lat, lon, population)
+        for row in rows:
+            name, lat, lon = row[0], float(row[1]), float(row[2])
+            population = int(row[3]) if len(row) > 3 and row[3] not in (None, "") else 0
+            key = normalize_place_name(name)
+            if not key:
+                continue
+
+            existing = self._index.get(key)
+            if existing is not None:
+                # Name collision: keep the more populous place
+                if population <= self._populations[existing]:
+                    continue
+                self._lats[existing], self._lons[existing] = lat, lon
+                self._populations[existing] = population
+                self._names[existing] = name
+                continue
+
+            self._index[key] = len(self._names)
+            self._names.append(name)
+            self._lats.append(lat)
+            self._lons.append(lon)
+            self._populations.append(population)
+
+        # Secondary indexes are rebuilt on the next query
+        self._prefix_keys = None
+        self._spatial = None
+        return self
+
+    def load_csv(self, path, name_col="name", lat_col="lat", lon_col="lon",
+                 population_col="population"):
+        # Header-based CSV/TSV (delimiter sniffed from the first line)
+        with open(path, newline="", encoding="utf-8") as f:
+            dialect = "excel-tab" if "\t" in f.readline() else "excel"
+            f.seek(0)
+            reader = csv.DictReader(f, dialect=dialect)
+            return self.add_places(
+                (r[name_col], r[lat_col], r[lon_col], r.get(population_col))
+                for r in reader if r.get(lat_col) and r.get(lon_col)
+            )
+
+    def load_geonames(self, path, include_alternates=False):
+        # GeoNames dump (e.g. cities15000.txt): tab separated, no header.
+        # Columns: 1 name, 2 asciiname, 3 alternatenames, 4 lat, 5 lon, 8 country, 14 population
+        def rows():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    cols = line.rstrip("\n").split("\t")
+                    if len(cols) < 15:
+                        continue
+                    lat, lon, country, pop = cols[4], cols[5], cols[8], cols[14]
+                    names = {cols[1], cols[2]}
+                    if include_alternates and cols[3]:
+                        names.update(cols[3].split(","))
+                    for name in names:
+                        yield name, lat, lon, pop
+                        yield f"{name}, {country}", lat, lon, pop
+
+        return self.add_places(rows())
+
+    # --- Lookups ---
+
+    def lookup(self, name):
+        # Exact (normalized) match against the local table
+        row = self._index.get(normalize_place_name(name))
+        if row is None:
+            return None
+        return GeocodeResult(self._lats[row], self._lons[row], "table", self._names[row])
+
+    def fuzzy_lookup(self, name, cutoff=0.75, window=200):
+        # 1. Prefix candidates via bisect on the sorted key list
+        key = normalize_place_name(name)
+        if not key or not self._index:
+            return None
+        if self._prefix_keys is None:
+            self._prefix_keys = sorted(self._index)
+        keys = self._prefix_keys
+
+        lo = bisect.bisect_left(keys, key)
+        hi = bisect.bisect_left(keys, key + "\uffff")
+        candidates = keys[lo:hi]
+
+        # 2. No prefix hit: close matches among the neighbours of the shortest
+        #    matching prefix (drop trailing words until something is nearby)
+        if not candidates:
+            words = key.split()
+            while words:
+                prefix = " ".join(words)
+                lo = bisect.bisect_left(keys, prefix)
+                hi = bisect.bisect_left(keys, prefix + "\uffff")
+                if hi > lo:
+                    break
+                words.pop()
+            neighbours = keys[max(0, lo - window // 2):lo + window // 2]
+            candidates = difflib.get_close_matches(key, neighbours, n=5, cutoff=cutoff)
+            if not candidates:
+                return None
+
+        # Prefer the most populous, then the shortest name
+        best = min(candidates, key=lambda k: (-self._populations[self._index[k]], len(k)))
+        row = self._index[best]
+        return GeocodeResult(self._lats[row], self._lons[row], "fuzzy", self._names[row])
+
+    def nearest(self, lat, lon, max_km=50.0):
+        # Nearest known place within max_km, using a lat-sorted band search
+        if not self._names:
+            return None
+        if self._spatial is None:
+            lats, lons = np.asarray(self._lats), np.asarray(self._lons)
+            order = np.argsort(lats, kind="stable")
+            self._spatial = (order, lats[order], lats, lons)
+        order, sorted_lats, lats, lons = self._spatial
+
+        band = max_km / 111.0
+        lo, hi = np.searchsorted(sorted_lats, [lat - band, lat + band])
+        rows = order[lo:hi]
+        if rows.size == 0:
+            return None
+
+        dist = haversine(lat, lon, lats[rows], lons[rows])
+
+        i = int(np.argmin(dist))
+        if dist[i] > max_km:
+            return None
+        row = int(rows[i])
+        return GeocodeResult(self._lats[row], self._lons[row], "table", self._names[row])
+
+    # --- Geocoding with cache ---
+
+    def geocode(self, name, timeout=5):
+        """
+        Resolve a place name: local table -> on-disk cache -> Nominatim -> fuzzy match.
+        Every geocoder answer (hits and misses) is persisted to the cache file.
+        Returns a GeocodeResult or None.
+        """
+        hit = self.lookup(name)
+        if hit:
+            return hit
+
+        key = normalize_place_name(name)
+        if key in self._cache:
+            cached = self._cache[key]
+            if cached is not None:
+                return GeocodeResult(cached[0], cached[1], "cache", name)
+            # Known geocoder miss: still allow a local fuzzy match
+            return self.fuzzy_lookup(name)
+
+        if not self.offline:
+            try:
+                if self._geolocator is None:
+                    # !pip install geopy
+                    from geopy.geocoders import Nominatim
+                    # Use a unique user_agent to help avoid 403 errors
+                    self._geolocator = Nominatim(user_agent="paleo_explorer_gazetteer")
+                self._wait_for_geocoder()
+                loc = self._geolocator.geocode(name, timeout=timeout)
+            except Exception:
+                loc = False # Network/geocoder failure: don't cache, fall back locally
+
+            if loc is not False:
+                self._cache[key] = [loc.latitude, loc.longitude] if loc else None
+                self.save_cache()
+                if loc:
+                    return GeocodeResult(loc.latitude, loc.longitude, "geocoder", name)
+
+        return self.fuzzy_lookup(name)
+
+    def _wait_for_geocoder(self):
+        # Space outbound requests GEOCODER_MIN_INTERVAL apart; table and cache hits never wait
+        with self._geocoder_lock:
+            now = time.monotonic()
+            delay = self._next_request - now
+            self._next_request = max(now, self._next_request) + GEOCODER_MIN_INTERVAL
+        if delay > 0:
+            time.sleep(delay)
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        folder = os.path.dirname(self.cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Write-then-rename so a crash never leaves a half-written cache
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp_path, self.cache_path)
+
+
+_default_gazetteer = None
+
+def get_gazetteer():
+    # Process-wide gazetteer: seed cities + optional bulk file + cache
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        _default_gazetteer = Gazetteer().add_places(SEED_PLACES)
+        if DEFAULT_PLACES_FILE and os.path.exists(DEFAULT_PLACES_FILE):
+            if DEFAULT_PLACES_FILE.endswith(".txt"):
+                _default_gazetteer.load_geonames(DEFAULT_PLACES_FILE)
+            else:
+                _default_gazetteer.load_csv(DEFAULT_PLACES_FILE)
+    return _default_gazetteer
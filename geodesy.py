@@ -0,0 +1,125 @@
+"""
+File: geodesy.py
+Description: Shared great-circle kernels: haversine distance, initial bearing and plate
+             speed for scalars, broadcast arrays, pairwise matrices and consecutive steps
+             along whole trajectory arrays, with an optional float32 mode and a Numba
+             path for large step computations.
+Library: numpy (+ numba when installed)
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+EARTH_RADIUS_KM = 6371.0
+# Set PALEO_NUMBA=0 to force the NumPy kernels even when numba is installed
+USE_NUMBA = numba is not None and os.environ.get("PALEO_NUMBA", "1") != "0"
+# Below this many steps the NumPy kernel wins over numba's call overhead
+NUMBA_MIN_STEPS = 100_000
+
+
+def _as_arrays(dtype, *values):
+    return [np.asarray(v, dtype=dtype) for v in values]
+
+
+def _as_radians(dtype, *values):
+    return [np.radians(v) for v in _as_arrays(dtype, *values)]
+
+
+def haversine(lat1, lon1, lat2, lon2, radius=EARTH_RADIUS_KM, dtype=np.float64):
+    """
+    Great-circle distance (km by default) between (lat1, lon1) and (lat2, lon2) in
+    degrees. Inputs broadcast; scalar input gives a NumPy scalar.
+    dtype=np.float32 halves memory for large arrays (errors reach ~1 km only for
+    near-antipodal pairs).
+    """
+    lat1, lon1, lat2, lon2 = _as_radians(dtype, lat1, lon1, lat2, lon2)
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return dtype(2 * radius) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def initial_bearing(lat1, lon1, lat2, lon2, dtype=np.float64):
+    # Initial great-circle bearing from point 1 to point 2 (degrees clockwise from north, 0-360)
+    lat1, lon1, lat2, lon2 = _as_radians(dtype, lat1, lon1, lat2, lon2)
+    dlon = lon2 - lon1
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % dtype(360)
+
+
+def pairwise_distances(lats1, lons1, lats2, lons2, radius=EARTH_RADIUS_KM, dtype=np.float64):
+    # (n, m) distance matrix between two point sets
+    lats1, lons1, lats2, lons2 = _as_arrays(dtype, lats1, lons1, lats2, lons2)
+    return haversine(lats1.ravel()[:, np.newaxis], lons1.ravel()[:, np.newaxis],
+                     lats2.ravel()[np.newaxis, :], lons2.ravel()[np.newaxis, :], radius, dtype)
+
+
+def speed_cm_per_year(distance_km, interval_ma):
+    # 1 km/Ma = 1e5 cm / 1e6 yr = 0.1 cm/yr
+    return np.asarray(distance_km) / np.asarray(interval_ma) * 0.1
+
+
+prange = numba.prange if numba is not None else range
+
+def _step_haversine(lats, lons, radius, out):
+    # Loop kernel over (trajectory, step); compiled by numba on first use
+    for i in prange(lats.shape[0]):
+        for j in range(lats.shape[1] - 1):
+            lat1, lat2 = np.radians(lats[i, j]), np.radians(lats[i, j + 1])
+            dlon = np.radians(lons[i, j + 1] - lons[i, j])
+            a = (np.sin((lat2 - lat1) / 2) ** 2 +
+                 np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2)
+            out[i, j] = 2 * radius * np.arcsin(np.sqrt(min(max(a, 0.0), 1.0)))
+
+
+_step_kernel = None
+
+def _numba_step_kernel():
+    global _step_kernel
+    if _step_kernel is None:
+        _step_kernel = numba.njit(parallel=True, fastmath=True, cache=True)(_step_haversine)
+    return _step_kernel
+
+
+def step_distances(lats, lons, radius=EARTH_RADIUS_KM, dtype=np.float64, use_numba=None):
+    """
+    Distance between consecutive points along the last axis: (..., n_steps) ->
+    (..., n_steps - 1). lats/lons can hold thousands of trajectories at once,
+    e.g. trajectory_engine.reconstruct_trajectories(...)[..., 0] and [..., 1].
+    """
+    lats, lons = np.broadcast_arrays(*_as_arrays(dtype, lats, lons))
+    if use_numba is None:
+        use_numba = USE_NUMBA and lats.size >= NUMBA_MIN_STEPS
+    use_numba = use_numba and numba is not None # Explicit True falls back to NumPy without numba
+    if not use_numba or lats.ndim == 0 or lats.shape[-1] < 2:
+        return haversine(lats[..., :-1], lons[..., :-1], lats[..., 1:], lons[..., 1:], radius, dtype)
+
+    shape = lats.shape
+    lats2d = np.ascontiguousarray(lats.reshape(-1, shape[-1]))
+    lons2d = np.ascontiguousarray(lons.reshape(-1, shape[-1]))
+    out = np.empty((lats2d.shape[0], shape[-1] - 1), dtype=dtype)
+    _numba_step_kernel()(lats2d, lons2d, dtype(radius), out)
+    return out.reshape(shape[:-1] + (shape[-1] - 1,))
+
+
+def step_bearings(lats, lons, dtype=np.float64):
+    # Initial bearing of each consecutive step along the last axis
+    lats, lons = np.broadcast_arrays(*_as_arrays(dtype, lats, lons))
+    return initial_bearing(lats[..., :-1], lons[..., :-1], lats[..., 1:], lons[..., 1:], dtype)
+
+
+def step_speeds(lats, lons, times_ma, dtype=np.float64, use_numba=None):
+    """
+    Speed (cm/yr) of each consecutive step along the last axis. times_ma is the
+    (n_steps,) age of each column, or a scalar step length in Ma.
+    """
+    distances = step_distances(lats, lons, dtype=dtype, use_numba=use_numba)
+    times_ma = np.asarray(times_ma, dtype=dtype)
+    intervals = np.abs(np.diff(times_ma)) if times_ma.ndim else np.abs(times_ma)
+    return speed_cm_per_year(distances, intervals).astype(dtype, copy=False)
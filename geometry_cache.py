@@ -0,0 +1,177 @@
+"""
+File: geometry_cache.py
+Description: On-disk cache of reconstructed topology geometries (coastlines, continents,
+             COBs) keyed by (model_name, time, anchor_plate_id, layer). Each entry is an
+             .npz of dateline-wrapped float32 vertex arrays + part offsets, so repeat
+             maps and animations skip reconstruction entirely.
+Library: pygplates + numpy (+ matplotlib collections for drawing)
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+#!pip install pygplates
+import pygplates
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PALEO_GEOMETRY_CACHE",
+    os.path.join(os.path.expanduser("~"), ".paleo_cache", "geometry")
+)
+LAYERS = ("continents", "coastlines", "COBs")
+
+# lats/lons: all vertices concatenated (float32); offsets: part i is
+# [offsets[i], offsets[i + 1]); closed: True for polygon parts, False for polylines
+ReconstructedLayer = namedtuple("ReconstructedLayer", ["lats", "lons", "offsets", "closed"])
+
+
+def layer_parts(layer):
+    # (lons, lats) vertex arrays for every part of a ReconstructedLayer
+    for start, stop in zip(layer.offsets[:-1], layer.offsets[1:]):
+        yield layer.lons[start:stop], layer.lats[start:stop]
+
+
+def reconstruct_layer(features, rotation_model, time, anchor_plate_id=0):
+    """
+    Reconstruct a feature collection to `time` and flatten it into a ReconstructedLayer.
+    Polygons keep their exterior ring only; parts are split at the dateline.
+    """
+    lats, lons, sizes, closed = [], [], [], []
+    if features is not None:
+        reconstructed = []
+        pygplates.reconstruct(features, rotation_model, reconstructed, float(time),
+                              anchor_plate_id=anchor_plate_id)
+
+        wrapper = pygplates.DateLineWrapper()
+        for rfg in reconstructed:
+            geometry = rfg.get_reconstructed_geometry()
+            if isinstance(geometry, pygplates.PolygonOnSphere):
+                parts = [(p.get_exterior_points(), True) for p in wrapper.wrap(geometry)]
+            elif isinstance(geometry, pygplates.PolylineOnSphere):
+                parts = [(p.get_points(), False) for p in wrapper.wrap(geometry)]
+            else:
+                continue # Points/multipoints are not drawn as map layers
+
+            for points, is_closed in parts:
+                lats.extend(p.get_latitude() for p in points)
+                lons.extend(p.get_longitude() for p in points)
+                sizes.append(len(points))
+                closed.append(is_closed)
+
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return ReconstructedLayer(np.asarray(lats, dtype=np.float32),
+                              np.asarray(lons, dtype=np.float32),
+                              offsets, np.asarray(closed, dtype=bool))
+
+
+class GeometryCache:
+    """
+    Memory first, then <root>/<model>/anchor_<id>/<layer>/<time>.npz, then a
+    pygplates reconstruction (stored for next time).
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        # root=None keeps the cache in memory only
+        self.root = root
+        self._memory = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "reconstructed": 0}
+
+    def key(self, model_name, time, anchor_plate_id, layer):
+        return (str(model_name), float(time), int(anchor_plate_id), layer)
+
+    def _path(self, key):
+        model_name, time, anchor_plate_id, layer = key
+        return os.path.join(self.root, model_name, f"anchor_{anchor_plate_id}", layer,
+                            f"{time:g}.npz")
+
+    def _load(self, key):
+        if key in self._memory:
+            self.stats["memory_hits"] += 1
+            return self._memory[key]
+
+        if self.root and os.path.exists(self._path(key)):
+            with np.load(self._path(key)) as data:
+                layer = ReconstructedLayer(data["lats"], data["lons"],
+                                           data["offsets"], data["closed"])
+            self._memory[key] = layer
+            self.stats["disk_hits"] += 1
+            return layer
+        return None
+
+    def _save(self, key, layer):
+        self._memory[key] = layer
+        if self.root:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, **layer._asdict())
+            os.replace(tmp_path, path) # Atomic, so parallel render workers can share it
+        return layer
+
+    def get(self, model_name, time, layer, features=None, rotation_model=None,
+            anchor_plate_id=0):
+        """
+        Reconstructed geometry of one layer at one time. features/rotation_model
+        are only used on a miss.
+        """
+        key = self.key(model_name, time, anchor_plate_id, layer)
+        cached = self._load(key)
+        if cached is not None:
+            return cached
+
+        if rotation_model is None:
+            raise ValueError(f"No cached {layer} for {model_name} at {time} Ma "
+                             f"and no rotation model to reconstruct it.")
+        self.stats["reconstructed"] += 1
+        return self._save(key, reconstruct_layer(features, rotation_model, time,
+                                                 anchor_plate_id))
+
+    def get_layers(self, plate_model, time, layers=LAYERS, anchor_plate_id=0):
+        # All map layers for a plate model session (model_registry) or an equivalent dict
+        rotation_model = getattr(plate_model["model"], "rotation_model", plate_model["model"])
+        return {layer: self.get(plate_model["model_name"], time, layer,
+                                plate_model.get(layer), rotation_model, anchor_plate_id)
+                for layer in layers}
+
+
+def plot_layer(ax, layer, facecolor='none', edgecolor='none', linewidth=0.5, alpha=1.0,
+               zorder=None, transform=None):
+    """
+    Draw a ReconstructedLayer as at most two collections: polygon parts filled
+    (PolyCollection) and polyline parts as lines (LineCollection).
+    transform defaults to cartopy PlateCarree. Returns the added artists.
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+    if transform is None:
+        import cartopy.crs as ccrs
+        transform = ccrs.PlateCarree()
+
+    polygons, polylines = [], []
+    for (lons, lats), is_closed in zip(layer_parts(layer), layer.closed):
+        (polygons if is_closed else polylines).append(np.column_stack([lons, lats]))
+
+    artists = []
+    if polygons:
+        artists.append(PolyCollection(polygons, facecolors=facecolor, edgecolors=edgecolor,
+                                      linewidths=linewidth, alpha=alpha, transform=transform))
+    if polylines:
+        line_color = edgecolor if edgecolor != 'none' else facecolor
+        artists.append(LineCollection(polylines, colors=line_color, linewidths=linewidth,
+                                      alpha=alpha, transform=transform))
+    for artist in artists:
+        if zorder is not None:
+            artist.set_zorder(zorder)
+        ax.add_collection(artist, autolim=False) # Keep the map extent (e.g. set_global)
+    return artists
+
+
+_default_cache = None
+
+def get_geometry_cache():
+    # Process-wide cache (each render worker gets its own, sharing the disk store)
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = GeometryCache()
+    return _default_cache
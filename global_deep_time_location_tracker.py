@@ -17,6 +17,18 @@ import gplately
 
 import time
 
+import pandas as pd
+
+# Batched plate partition + rotation for whole time series (trajectory_engine.py)
+from trajectory_engine import partition_points, reconstruct_trajectories
+# Process-pool frame rendering + streamed ffmpeg encoding (parallel_render.py)
+from parallel_render import (DEFAULT_WORKERS, FrameSpec, render_frames_parallel,
+                             render_frames_to_video)
+# Plate models loaded once per process, shared across queries (model_registry.py)
+from model_registry import get_plate_model
+# Vectorized haversine / plate speed kernels (geodesy.py)
+from geodesy import haversine, speed_cm_per_year, step_speeds
+
 import ipywidgets as widgets
 
 from IPython.display import Video, display, clear_output, HTML
@@ -40,152 +52,109 @@ def get_valid_input():
             print("Invalid numerical input. Please try again.")
 
 def calculate_speed(point1, point2, time_interval_ma):
-    # Calculates plate speed in cm/year using Haversine distance
-    # radius of Earth in cm
-    R = 6371 * 1e5
-    lat1, lon1 = np.radians(point1)
-    lat2, lon2 = np.radians(point2)
-
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-    distance_cm = R * c
-
-    # Speed = distance / (time in years)
-    speed_cm_year = distance_cm / (time_interval_ma * 1e6)
-    return speed_cm_year
+    # Calculates plate speed in cm/year using Haversine distance (geodesy.py)
+    lat1, lon1 = point1
+    lat2, lon2 = point2
+    return speed_cm_per_year(haversine(lat1, lon1, lat2, lon2), time_interval_ma)
 
-def generate_deep_time_path(target_lat, target_lon, location_name="Target Location", start_time=1000, model_name="Merdith2021"):
+def compute_deep_time_trajectory(target_lat, target_lon, start_time=1000, time_step=10,
+                                 model_name="Merdith2021", plate_model=None):
     """
-    # Initializes the Plate Model
-    # Generates animation frames tracking a specific lat/lon through time
+    # Pure compute stage: no figures, no frames.
+    # Returns a trajectory table (time, lat, lon, speed, plate_id), past to present.
+    # Speed (cm/yr) is measured from the previous (older) step; 0 for the first row.
     """
-    # --- Initialization ---
-    print(f"Initializing {model_name} model...")
-    data_server = gplately.download.DataServer(model_name)
-    rot_model, topo_features, static_polys = data_server.get_plate_reconstruction_files()
-    model = gplately.PlateReconstruction(rot_model, topo_features, static_polys)
-    coastlines, continents, COBs = data_server.get_topology_geometries()
+    plate_model = plate_model or get_plate_model(model_name)
+    model = plate_model["model"]
 
-    # Create folder for frames
-    frame_dir = 'animation_frames'
-    if not os.path.exists(frame_dir):
-        os.makedirs(frame_dir)
+    # Define time steps (Past to Present)
+    times = np.arange(start_time, -1, -time_step, dtype=float)
+
+    # --- Plate Identification + reconstruction in one batched pass
+    # We find out which plate point belongs to today, then rotate it to every time step
+    plate_id = partition_points([target_lat], [target_lon], plate_model["static_polys"], model)
+    path = reconstruct_trajectories([target_lat], [target_lon], times, model,
+                                    plate_ids=plate_id)[0]
+
+    speeds = np.zeros(times.size)
+    if times.size > 1:
+        speeds[1:] = step_speeds(path[:, 0], path[:, 1], times)
+
+    return pd.DataFrame({
+        "time": times,
+        "lat": path[:, 0],
+        "lon": path[:, 1],
+        "speed": speeds,
+        "plate_id": int(plate_id[0])
+    })
+
+def export_trajectory(trajectory, path):
+    # CSV or Parquet export, picked from the file extension (no plotting involved)
+    if path.endswith(".parquet"):
+        trajectory.to_parquet(path, index=False)
     else:
-        # Clean existing frames to prevent mixing old/new runs.
-        for f in os.listdir(frame_dir):
-            if f.endswith('.png'):
-                os.remove(os.path.join(frame_dir, f))
-
-    # --- Plate Identification
-    # We find out which plate point belongs to today
-
-    point_today = pygplates.PointOnSphere(target_lat, target_lon)
-    feature_today = pygplates.Feature()
-    feature_today.set_geometry(point_today)
-    
-    partitioned_feature = pygplates.partition_into_plates(static_polys, rot_model, feature_today)
-    plate_id = partitioned_feature[0].get_reconstruction_plate_id()
-    
-    print(f"{location_name} identified on Plate ID: {plate_id}")
-
-    history_lats, history_lons = [], []
-    speeds = []
+        trajectory.to_csv(path, index=False)
+    return path
+
+def supercontinent_label(time):
+    # Supercontinent Labels
+    label = "Deep Time Tracker"
+    if 300 >= time >= 200: label = "Supercontinent: Pangea"
+    elif 900 >= time >= 700: label = "Supercontinent: Rodinia"
+    return label
+
+def deep_time_frame_specs(trajectory):
+    # One precomputed FrameSpec per trajectory row (past to present)
+    history_lats = trajectory["lat"].to_numpy()
+    history_lons = trajectory["lon"].to_numpy()
+
+    specs = []
+    for i, row in enumerate(trajectory.itertuples(index=False)):
+        time = int(row.time)
+        specs.append(FrameSpec(
+            # Use index 'i' to keep frames in chronological order.
+            filename=f"frame_{i:03d}.png",
+            time=time,
+            # Above Map (Time and Speed)
+            title=f"Time: {time} Ma   |   Speed: {row.speed:.2f} cm/yr",
+            # Below Map (Current Lat and Lon)
+            caption=f"Paleo-Coordinates: {row.lat:.2f}°, {row.lon:.2f}°",
+            label=supercontinent_label(time),
+            marker=(row.lat, row.lon),
+            trail=(history_lats[:i + 1], history_lons[:i + 1])
+        ))
+    return specs
+
+def render_deep_time_frames(trajectory, plate_model, frame_dir='animation_frames',
+                            max_workers=DEFAULT_WORKERS):
+    # Optional render stage: PNG stills (frame_000.png, frame_001.png, ...)
+    render_frames_parallel(deep_time_frame_specs(trajectory), plate_model["model_name"],
+                           frame_dir, style="tracker", max_workers=max_workers)
+    return frame_dir
+
+def render_deep_time_video(trajectory, plate_model, video_name, fps=7,
+                           max_workers=DEFAULT_WORKERS):
+    # Optional render stage: frames streamed straight into ffmpeg (no PNG round-trip)
+    render_frames_to_video(deep_time_frame_specs(trajectory), plate_model["model_name"],
+                           video_name, style="tracker", fps=fps, max_workers=max_workers)
+    return video_name
 
-    # Define time steps (Past to Present)
-    # range() creates integers, which we will convert to floats inside the loop.
-    time_steps = range(start_time, -1, -10)
+def generate_deep_time_path(target_lat, target_lon, location_name="Target Location", start_time=1000, model_name="Merdith2021"):
+    """
+    # Initializes the Plate Model (first query only; later ones reuse the registry)
+    # Generates animation frames tracking a specific lat/lon through time
+    # (compute_deep_time_trajectory alone gives the numbers without any rendering)
+    """
+    plate_model = get_plate_model(model_name)
 
     print(f"Tracking {location_name} from {start_time} Ma to Present...")
+    trajectory = compute_deep_time_trajectory(target_lat, target_lon, start_time,
+                                              plate_model=plate_model)
+    print(f"{location_name} identified on Plate ID: {trajectory['plate_id'].iloc[0]}")
 
-    for i, time in enumerate(time_steps):
-
-        recon_time = float(time)
-
-        # --- Add fallbacks here ---
-        p_lat, p_lon = 0.0, 0.0 
-        current_speed = 0.0
-
-        fig = plt.figure(figsize=(12, 7))
-        ax = plt.axes(projection=ccrs.Robinson()) 
-        # Robinson for global drift can be better than Mollweide
-        ax.set_facecolor('#f0f8ff')
-
-        # Plot Geography
-        gPlot = gplately.PlotTopologies(model, time=time, continents=continents,
-                                        coastlines=coastlines, COBs=COBs)
-        
-        gPlot.plot_continents(ax, facecolor='#e6ccb2', edgecolor='none', alpha=0.9)
-        gPlot.plot_coastlines(ax, color='#222222', linewidth=0.5)
-
-        # Calculate speed if we have a previous point
-        current_speed = 0
-
-        # Dynamic Point Reconstruction
-        try:
-            
-            # Move the point by getting the specific rotation for its Plate ID
-            rotation = model.rotation_model.get_rotation(recon_time, plate_id)
-            reconstructed_point = rotation * point_today
-            p_lat, p_lon = reconstructed_point.to_lat_lon()
-
-            history_lats.append(p_lat)
-            history_lons.append(p_lon)
-
-            # Properly pass tuples for coordinate calculation
-            if i > 0:
-                prev_pt = (history_lats[i-1], history_lons[i-1])
-                current_pt = (p_lat, p_lon)
-                current_speed = calculate_speed(prev_pt, current_pt, 10)
-
-            # Plot the trail (history)
-            if len(history_lons) > 1:
-                ax.plot(history_lons, history_lats, color='blue', linewidth=1.5,
-                        linestyle='--', transform=ccrs.PlateCarree(), alpha=0.5)
-            
-
-            # Plot the current position (the red dot).
-            ax.plot(p_lon, p_lat, 'ro', markersize=10, transform=ccrs.PlateCarree(),
-                    markeredgecolor='white', zorder=10)
-            
-        except Exception as e:
-            print(f"Could not reconstruct point at {time} Ma: {e}")
-
-
-        # Above Map (Time and Speed)
-        plt.suptitle(f"Time: {time} Ma   |   Speed: {current_speed:.2f} cm/yr", 
-                     fontsize=16, color='black', fontweight='bold', y=0.95)
-        
-        # Below Map (Current Lat and Lon)
-        ax.text(0.5, -0.05, f"Paleo-Coordinates: {p_lat:.2f}°, {p_lon:.2f}°", 
-                transform=ax.transAxes, color='black', ha='center', fontsize=12,
-                fontweight='bold')
-
-        # Supercontinent Labels
-        label = "Deep Time Tracker"
-        if 300 >= time >= 200: label = "Supercontinent: Pangea"
-        elif 900 >= time >= 700: label = "Supercontinent: Rodinia"
-   
-        ax.text(0.5, 0.05, label, transform=ax.transAxes, color='white', ha='center', 
-                fontsize=16, bbox=dict(facecolor='red', alpha=0.5))
-
-
-        # Save Frame
-        # Use index 'i' to keep frames in chronological order.
-        plt.savefig(f"{frame_dir}/frame_{i:03d}.png", bbox_inches='tight', dpi=100)
-        plt.close()
-
-    print("Frames complete. Compiling video...")
+    print("Rendering and encoding video...")
     safe_name = location_name.replace(' ', '_')
-    video_name = f"{safe_name}.mp4"
-
-    # Compile Video (Colab/Linux compatible).
-    os.system(f"ffmpeg -y -r 7 -i '{frame_dir}/frame_%03d.png' "
-              f"-vf 'pad=ceil(iw/2)*2:ceil(ih/2)*2' "
-              f"-vcodec libx264 -crf 24 -pix_fmt yuv420p {video_name}")
-    
-    return video_name
+    return render_deep_time_video(trajectory, plate_model, f"{safe_name}.mp4")
 
 
 # --- Execution ---
@@ -0,0 +1,195 @@
+"""
+File: habitability.py
+Description: 100 Ma habitability scoring shared by the interactive Deep Time Explorer and
+             the batch pipeline: dynamic bathymetry, hothouse paleo-temperature, fossil
+             biome override and the human / dinosaur habitability indices.
+Library: math, re (pure Python, no network)
+"""
+
+import bisect
+import math
+import re
+
+# Eustatic rise (m) used by the dynamic bathymetry model
+EUSTATIC_RISE = 250
+# Mid-Cretaceous global warming (°C) before polar amplification
+GLOBAL_DELTA = 10.0
+
+# Taxonomic indicators
+# Marine Specialists (cannot exist on land)
+deep_marine_taxa = ['Platecarpus', 'Mosasaur', 'Plesiosaur', 'Ichthyornis', 'Hesperornis', 'Xiphactinus', \
+                    'Cephalopoda', 'Ammonite', 'Toxochelys']
+shallow_marine_taxa = ['Bivalvia', 'Acutostrea', 'Agerostrea', 'Oyster', 'Gastropoda', 'Anthozoa']
+
+# Land Specialists
+land_taxa = ['Anklyosaur', 'Hadrosaur', 'Tyrannosaur', 'Certopsid', 'Ornithischia', 'Lycopodiopsida', \
+             'Pteridopsida', 'Anthozoa']
+
+# Most specific first: a record matching several lists takes the first label
+ENVIRONMENTS = ("deep_marine", "shallow_marine", "land")
+
+
+def net_water_depth(modern_elevation, p_lat):
+    # Eustatic rise + thermal expansion (warm water expands)
+    thermal_expansion = 15 * (1.0 - (abs(p_lat) / 90))
+
+    # Loading factor: Low-lying basins (like the Gulf) sink more under water weight
+    loading_factor = 1.33 if modern_elevation < 150 else 1.0
+
+    # Net paleo-Depth (if > 0, the location is submerged)
+    return (EUSTATIC_RISE + thermal_expansion) - (modern_elevation * loading_factor)
+
+
+def paleo_temperature(lat, p_lat, is_submerged, global_delta=GLOBAL_DELTA):
+    amplitude = 1.0 - (0.5 *math.cos(math.radians(p_lat)))
+    local_delta = global_delta * amplitude
+
+    # Apply cooling if submerged, heating if land
+    local_delta *= 0.65 if is_submerged else 1.2
+    modern_baseline = 15 + (12 * math.cos(math.radians(lat)))
+    return round(modern_baseline + local_delta, 2)
+
+
+class TaxonClassifier:
+    """
+    All indicator taxa compiled once into a single case-insensitive regex.
+    classifier.classify(records)        -> per-record frozenset of environments
+
+    records are PBDB occurrence dicts (tna/cll) or "Name (Class)" strings; the
+    whole batch is scanned in one pass.
+    """
+
+    def __init__(self, taxa=None):
+        taxa = taxa or {"deep_marine": deep_marine_taxa, "shallow_marine": shallow_marine_taxa,
+                        "land": land_taxa}
+        self._environments = {} # lowercase taxon -> environments it indicates
+        for environment, names in taxa.items():
+            for name in names:
+                self._environments.setdefault(name.lower(), set()).add(environment)
+
+        # Longest first so a taxon is never cut short by a shorter prefix
+        alternatives = sorted(self._environments, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, alternatives)), re.IGNORECASE)
+
+    @staticmethod
+    def record_text(record):
+        if isinstance(record, dict):
+            return f"{record.get('tna', '')} ({record.get('cll', '')})"
+        return str(record)
+
+    def classify(self, records):
+        texts = [self.record_text(r) for r in records]
+        # Offsets of each record in the newline-joined batch
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+
+        found = [set() for _ in texts]
+        for match in self._pattern.finditer("\n".join(texts)):
+            record = bisect.bisect_right(starts, match.start()) - 1
+            found[record].update(self._environments[match.group().lower()])
+        return [frozenset(f) for f in found]
+
+
+def environment_label(environments):
+    # Primary label of one record (deep marine > shallow marine > land), None if no indicator
+    for environment in ENVIRONMENTS:
+        if environment in environments:
+            return environment
+    return None
+
+
+_default_classifier = None
+
+def get_taxon_classifier():
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = TaxonClassifier()
+    return _default_classifier
+
+
+def fossil_list_from_records(records, max_names=5):
+    # "Name (Class)" entries for PBDB occurrence records, de-duplicated in order
+    fossil_list = []
+    for r in records:
+        # In standard v1.2 (without 'vocab'), the keys are 'tna' and 'cll'
+        name, t_class = r.get('tna'), r.get('cll', 'Unknown')
+        entry = f"{name} ({t_class})"
+        if name and entry not in fossil_list:
+            fossil_list.append(entry)
+    return fossil_list[:max_names]
+
+
+def _evidence(record_environments):
+    found = frozenset().union(*record_environments)
+    return tuple(environment in found for environment in ENVIRONMENTS)
+
+
+def score_site(lat, modern_elevation, p_lat, fossil_list):
+    """
+    Full 100 Ma assessment of one site from its modern latitude, modern elevation (m),
+    paleo-latitude and nearby fossils. Returns a dict with the water depth, paleo
+    temperature, environment labels (site and per fossil record) and habitability
+    indices (0-100).
+    """
+    # 1. Dynamic Global Bathymetry
+    net_depth = net_water_depth(modern_elevation, p_lat)
+    is_submerged = net_depth > 0
+
+    # 2. Paleo-temperature (the "Hothouse Delta" depends on submersion)
+    paleo_temp = paleo_temperature(lat, p_lat, is_submerged)
+
+    # 3. Biome override logic: environment and depth synthesis
+    record_environments = get_taxon_classifier().classify(fossil_list)
+    has_deep, has_shallow, has_land = _evidence(record_environments)
+
+    if has_deep:
+        env_label = "🌊 Deep Marine (Fossil Override)"
+        depth_label = f"{round(max(net_depth, 100))}m"
+        experience = "You are treading water in a vast seaway. Apex predators are circling below."
+
+    elif is_submerged and not has_land:
+        env_label = "🌊 Submerged Continental Shelf (Dynamic Model)"
+        depth_label = f"{round(net_depth)}m"
+        experience = "Though the plate is continental, high sea levels have flooded this region."
+
+    elif is_submerged and has_land:
+        env_label = "🌊 Coastal Marine (Bloat & Float Zone)"
+        depth_label = f"{round(net_depth)}m"
+        experience = "You are in shallow water. Land is nearby, as land fossils are present."
+
+    else:
+        env_label = "🌋 Terrestrial/Inland"
+        depth_label = "N/A"
+        experience = "You're on firm ground in a humid Cretaceous world."
+
+    # 4. Habitability Scoring
+    # Human: optimal at 22°C. Drastic drop after 35°C (wet bulb/heat stroke limits).
+    human_score = max(0, min(100, 100 - (abs(paleo_temp - 22) ** 1.5) * 2))
+
+    # Dinosaur: optimal at 32°C. Large theropods handled heat better than cold.
+    dino_score = max(0, min(100, 100 - (abs(paleo_temp - 32) ** 1.3) * 2))
+
+    # Adjust scores: being in deep water lower human habitability significantly
+    if is_submerged:
+        human_score = 10
+
+    if has_deep:
+        human_score = 10
+        dino_score = 60
+
+    return {
+        "net_depth": net_depth,
+        "is_submerged": is_submerged,
+        "paleo_temp": paleo_temp,
+        "has_deep": has_deep,
+        "has_shallow": has_shallow,
+        "has_land": has_land,
+        "fossil_labels": [environment_label(e) for e in record_environments],
+        "env_label": env_label,
+        "depth_label": depth_label,
+        "experience": experience,
+        "human_score": human_score,
+        "dino_score": dino_score
+    }
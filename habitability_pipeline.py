@@ -0,0 +1,275 @@
+"""
+File: habitability_pipeline.py
+Description: Non-interactive batch version of the Deep Time Explorer habitability report.
+             Sites from a CSV run through geocode -> (climate, elevation, reconstruction,
+             fossils fetched concurrently) -> scoring, with a concurrency limit per upstream
+             service. Rows are streamed to Parquet part files as sites complete, and a rerun
+             resumes from the sites already written.
+Library: pandas + pyarrow (Parquet), concurrent.futures
+"""
+
+import glob
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from climate_fetcher import ensure_pool_size, fetch_climate_job, year_job
+from gazetteer import get_gazetteer
+from habitability import fossil_list_from_records, score_site
+from http_cache import cached_get, get_http_cache
+from pbdb_index import get_pbdb_index
+from raster_sampling import local_elevation
+from reconstruction_service import get_reconstruction_service, reconstruct_point
+
+# Maximum requests in flight per upstream service (the gazetteer itself spaces
+# Nominatim requests 1 s apart; table and cache hits are not throttled)
+DEFAULT_LIMITS = {"geocode": 1, "climate": 8, "elevation": 4, "gplates": 4, "pbdb": 4}
+# Sites being processed at once (each holds up to 4 fetches)
+DEFAULT_SITES_IN_FLIGHT = int(os.environ.get("PALEO_BATCH_SITES", 32))
+# Rows per Parquet part file (each part is also a resume checkpoint)
+DEFAULT_PART_ROWS = 500
+
+PBDB_OCCS_URL = "https://paleobiodb.org/data1.2/occs/list.json"
+OPEN_ELEVATION_URL = "https://api.open-elevation.com/api/v1/lookup"
+
+Site = namedtuple("Site", ["site_id", "name", "lat", "lon"])
+
+# Output schema; fixed dtypes so every part file has the same Parquet schema
+COLUMNS = {
+    "site_id": "string", "name": "string", "lat": "float64", "lon": "float64",
+    "modern_temp": "float64", "modern_precip": "float64", "modern_elevation": "float64",
+    "p_lat": "float64", "p_lon": "float64", "paleo_temp": "float64", "net_depth": "float64",
+    "is_submerged": "boolean", "environment": "string", "depth_label": "string",
+    "human_score": "float64", "dino_score": "float64", "fossils": "string",
+    "fossil_labels": "string", "error": "string"
+}
+
+
+def read_sites(path, name_col="name", lat_col="lat", lon_col="lon", id_col="site_id"):
+    """
+    Sites from a CSV with a place-name column and/or lat/lon columns (rows with
+    coordinates skip geocoding). Without an id column the row number is the site ID.
+    """
+    df = pd.read_csv(path)
+    n = len(df)
+    ids = df[id_col].astype(str) if id_col in df else pd.Series(range(n)).astype(str)
+    names = df[name_col].fillna("").astype(str) if name_col in df else pd.Series([""] * n)
+    lats = df[lat_col].astype(float) if lat_col in df else pd.Series([float("nan")] * n)
+    lons = df[lon_col].astype(float) if lon_col in df else pd.Series([float("nan")] * n)
+    return [Site(*row) for row in zip(ids, names, lats, lons)]
+
+
+# --- Stage fetchers (one site each) ---
+
+def fetch_modern_climate(lat, lon, year=2023):
+    # Mean daily temperature and annual precipitation (raises if the archive has no answer)
+    job = year_job(lat, lon, year, ("temperature_2m_mean", "precipitation_sum"))
+    data = fetch_climate_job(job, timezone="auto")
+    if data.get("error"):
+        raise RuntimeError(data.get("reason", "Open-Meteo error"))
+
+    valid_temps = [t for t in data['daily']['temperature_2m_mean'] if t is not None]
+    valid_precips = [p for p in data['daily']['precipitation_sum'] if p is not None]
+    avg_temp = sum(valid_temps) / len(valid_temps) if valid_temps else 27.0
+    total_precip = sum(valid_precips) if valid_precips else 1840.0
+    return round(avg_temp, 2), round(total_precip, 2)
+
+
+def fetch_elevation(lat, lon):
+    # Local DEM first (PALEO_ELEVATION_RASTER), then open-elevation (raises if both fail)
+    elevation = local_elevation(lat, lon)
+    if elevation is not None and not math.isnan(elevation):
+        return elevation
+    response = cached_get(OPEN_ELEVATION_URL, params={"locations": f"{lat},{lon}"}, timeout=3)
+    response.raise_for_status()
+    return response.json()['results'][0]['elevation']
+
+
+def fetch_fossils(lat, lon, interval="Cretaceous", limit=10, max_names=5):
+    # "Name (Class)" strings for PBDB occurrences within ±0.5° of the site
+    # (local index when a dump has been imported, else paleobiodb.org)
+    params = {
+        "lngmin": lon - 0.5, "lngmax": lon + 0.5,
+        "latmin": lat - 0.5, "latmax": lat + 0.5,
+        "interval": interval, "show": "ident,class", "limit": limit
+    }
+    index = get_pbdb_index()
+    if index is not None:
+        records = index.records(params)
+    else:
+        response = cached_get(PBDB_OCCS_URL, params=params, verify=False, timeout=10)
+        response.raise_for_status()
+        records = response.json().get('records', [])
+    return fossil_list_from_records(records, max_names)
+
+
+# --- Pipeline ---
+
+def _limited(semaphore, fn, *args):
+    with semaphore:
+        return fn(*args)
+
+
+def _stage_result(future, stage, errors, fallback=None):
+    # A failed stage records "stage: reason" on the row instead of aborting the run
+    try:
+        return future.result()
+    except Exception as e:
+        errors.append(f"{stage}: {e}")
+        return fallback
+
+
+def _process_site(site, age, model, semaphores, fetch_pool):
+    row = {"site_id": site.site_id, "name": site.name, "lat": site.lat, "lon": site.lon}
+    errors = []
+
+    # 1. Geocode (only sites without coordinates)
+    lat, lon = site.lat, site.lon
+    if pd.isna(lat) or pd.isna(lon):
+        try:
+            location = _limited(semaphores["geocode"], get_gazetteer().geocode, site.name)
+        except Exception as e:
+            row["error"] = f"geocode: {e}"
+            return row
+        if not location:
+            row["error"] = "location not found"
+            return row
+        lat, lon = row["lat"], row["lon"] = location.lat, location.lon
+
+    # 2. Climate, elevation, reconstruction and fossils concurrently
+    futures = {
+        "climate": fetch_pool.submit(_limited, semaphores["climate"], fetch_modern_climate, lat, lon),
+        "elevation": fetch_pool.submit(_limited, semaphores["elevation"], fetch_elevation, lat, lon),
+        "gplates": fetch_pool.submit(_limited, semaphores["gplates"], reconstruct_point,
+                                     lon, lat, age, model),
+        "pbdb": fetch_pool.submit(_limited, semaphores["pbdb"], fetch_fossils, lat, lon)
+    }
+    # Failed stages fall back like the interactive report (the row is retried on resume)
+    row["modern_temp"], row["modern_precip"] = _stage_result(
+        futures["climate"], "climate", errors, fallback=(27.0, 2000.0))
+    row["modern_elevation"] = _stage_result(futures["elevation"], "elevation", errors, fallback=0)
+    fossil_list = _stage_result(futures["pbdb"], "pbdb", errors, fallback=[])
+    paleo = _stage_result(futures["gplates"], "reconstruction", errors)
+    if errors:
+        row["error"] = "; ".join(errors)
+    if paleo is None:
+        return row
+    row["p_lon"], row["p_lat"] = paleo
+
+    # 3. Scoring
+    report = score_site(lat, row["modern_elevation"], row["p_lat"], fossil_list)
+    row.update({
+        "paleo_temp": report["paleo_temp"],
+        "net_depth": report["net_depth"],
+        "is_submerged": report["is_submerged"],
+        "environment": report["env_label"],
+        "depth_label": report["depth_label"],
+        "human_score": report["human_score"],
+        "dino_score": report["dino_score"],
+        "fossils": "; ".join(fossil_list),
+        "fossil_labels": "; ".join(label or "none" for label in report["fossil_labels"])
+    })
+    return row
+
+
+def _part_paths(output_dir):
+    return sorted(glob.glob(os.path.join(output_dir, "part-*.parquet")))
+
+
+def completed_site_ids(output_dir):
+    # Site IDs already written (the checkpoint a rerun resumes from); the last row
+    # of each site decides, and sites with any stage error are retried
+    done = set()
+    for path in _part_paths(output_dir):
+        df = pd.read_parquet(path, columns=["site_id", "error"])
+        failed = df["error"].notna()
+        done.update(df.loc[~failed, "site_id"].astype(str))
+        done.difference_update(df.loc[failed, "site_id"].astype(str))
+    return done
+
+
+def _write_part(output_dir, index, rows):
+    # Write-then-rename so an interrupted run never leaves a half-written part
+    df = pd.DataFrame(rows, columns=list(COLUMNS)).astype(COLUMNS)
+    path = os.path.join(output_dir, f"part-{index:05d}.parquet")
+    df.to_parquet(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def run_habitability_batch(sites, output_dir, age=100, model="MULLER2016",
+                           limits=None, sites_in_flight=DEFAULT_SITES_IN_FLIGHT,
+                           part_rows=DEFAULT_PART_ROWS):
+    """
+    Score every site (a list of Site or a CSV path) and stream rows to
+    output_dir/part-*.parquet. Sites already present in output_dir are skipped
+    (except rows with an error, which are retried), so an interrupted run
+    picks up where it stopped. Returns the number of sites processed in this run.
+    """
+    if isinstance(sites, str):
+        sites = read_sites(sites)
+    os.makedirs(output_dir, exist_ok=True)
+    done = completed_site_ids(output_dir)
+    pending = iter([s for s in sites if s.site_id not in done])
+    part_index = len(_part_paths(output_dir))
+
+    limits = dict(DEFAULT_LIMITS, **(limits or {}))
+    if get_reconstruction_service().backend.name == "local":
+        limits["gplates"] = 1 # One pygplates model per process: rotate sites one at a time
+    semaphores = {stage: threading.BoundedSemaphore(n) for stage, n in limits.items()}
+    fetch_workers = sum(limits[stage] for stage in ("climate", "elevation", "gplates", "pbdb"))
+    # Every fetch thread can hold a connection on the shared HTTP session
+    ensure_pool_size(get_http_cache().session, fetch_workers)
+
+    buffer, processed, started = [], 0, time.time()
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+         ThreadPoolExecutor(max_workers=sites_in_flight) as site_pool:
+
+        def submit_next():
+            site = next(pending, None)
+            if site is not None:
+                in_flight.add(site_pool.submit(_process_site, site, age, model,
+                                               semaphores, fetch_pool))
+
+        in_flight = set()
+        for _ in range(sites_in_flight):
+            submit_next()
+
+        # Refill as sites finish so only sites_in_flight sites are held in memory
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                buffer.append(future.result())
+                processed += 1
+                submit_next()
+
+            if len(buffer) >= part_rows or (not in_flight and buffer):
+                _write_part(output_dir, part_index, buffer)
+                part_index += 1
+                buffer = []
+                rate = processed / max(time.time() - started, 1e-9)
+                print(f"{len(done) + processed} sites written ({rate:.1f} sites/s)")
+
+    return processed
+
+
+def load_results(output_dir):
+    # All part files as one DataFrame (the last row wins for a repeated site)
+    parts = [pd.read_parquet(path) for path in _part_paths(output_dir)]
+    if not parts:
+        return pd.DataFrame(columns=list(COLUMNS)).astype(COLUMNS)
+    df = pd.concat(parts, ignore_index=True)
+    return df.drop_duplicates("site_id", keep="last").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3:
+        print("Usage: python habitability_pipeline.py sites.csv output_dir [age]")
+        sys.exit(1)
+    run_habitability_batch(sys.argv[1], sys.argv[2],
+                           age=float(sys.argv[3]) if len(sys.argv) > 3 else 100)
@@ -0,0 +1,200 @@
+"""
+File: http_cache.py
+Description: Persistent, content-addressed cache for remote API calls
+             (Open-Meteo, GPlates web service, open-elevation, PBDB)
+Library: requests + sqlite3
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+DEFAULT_DB_PATH = os.environ.get(
+    "PALEO_HTTP_CACHE",
+    os.path.join(os.path.expanduser("~"), ".paleo_cache", "http_cache.sqlite")
+)
+# Entries older than this are re-fetched when online (default 30 days)
+DEFAULT_TTL = float(os.environ.get("PALEO_HTTP_CACHE_TTL", 30 * 24 * 3600))
+# Least recently used entries beyond this count are evicted
+DEFAULT_MAX_ENTRIES = int(os.environ.get("PALEO_HTTP_CACHE_MAX_ENTRIES", 20000))
+# Offline replay: serve only from the cache (any age), never touch the network
+OFFLINE = os.environ.get("PALEO_HTTP_OFFLINE", "0") == "1"
+
+
+class OfflineCacheMiss(requests.ConnectionError):
+    # Raised in offline replay mode when a request was never recorded.
+    # Subclasses ConnectionError so existing "network failed" handlers still apply.
+    pass
+
+
+def normalize_request(url, params=None, method="GET"):
+    """
+    Canonical form of a request: query-string and params merged, keys sorted,
+    scheme/host lower-cased. Returns (cache_key, canonical_url).
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    for k, v in (params or {}).items():
+        if v is None:
+            continue # requests drops None params too
+        values = v if isinstance(v, (list, tuple)) else [v]
+        query.extend((k, str(item)) for item in values)
+
+    # Stable sort on the key keeps the order of repeated values (daily=a&daily=b)
+    query.sort(key=lambda kv: kv[0])
+    canonical = (f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path}"
+                 f"?{urlencode(query)}")
+    key = hashlib.sha256(f"{method.upper()} {canonical}".encode()).hexdigest()
+    return key, canonical
+
+
+class CachedResponse:
+    # Minimal stand-in for requests.Response, replayed from the cache
+
+    def __init__(self, url, status_code, content, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = True
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+
+class HttpCache:
+    """
+    SQLite-backed GET cache keyed on the normalized URL + params.
+    Only successful (200) responses are stored; failures are always retried.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, ttl=DEFAULT_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, offline=OFFLINE, session=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.session = session or requests.Session()
+        self.hits = 0
+        self.misses = 0
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT,
+                body BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self._db.commit()
+
+    def get(self, url, params=None, **kwargs):
+        # Drop-in for requests.get(url, params=..., verify=..., timeout=...)
+        key, canonical = normalize_request(url, params)
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, created_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row and (self.offline or now - row[3] <= self.ttl):
+                self._db.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                self.hits += 1
+                return CachedResponse(canonical, row[0], row[2], json.loads(row[1] or "{}"))
+
+        if self.offline:
+            raise OfflineCacheMiss(f"Offline replay: no cached response for {canonical}")
+
+        self.misses += 1
+        response = self.session.get(url, params=params, **kwargs)
+        if response.status_code == 200:
+            self.store(key, canonical, response)
+        return response
+
+    def store(self, key, canonical, response):
+        now = time.time()
+        headers = {"Content-Type": response.headers.get("Content-Type", "")}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, canonical, response.status_code, json.dumps(headers),
+                 response.content, now, now))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # LRU eviction down to max_entries (caller holds the lock)
+        self._db.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )""", (self.max_entries,))
+
+    def purge_expired(self):
+        # Explicitly drop entries past their TTL (they are otherwise kept for replay)
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            self._db.commit()
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits,
+                "misses": self.misses, "offline": self.offline}
+
+
+_default_cache = None
+
+def get_http_cache():
+    # Process-wide cache instance (configured from the PALEO_HTTP_* variables)
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache()
+    return _default_cache
+
+def set_offline(offline=True):
+    # Switch the shared cache into (or out of) read-only replay mode
+    get_http_cache().offline = offline
+
+def cached_get(url, params=None, **kwargs):
+    return get_http_cache().get(url, params=params, **kwargs)
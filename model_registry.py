@@ -0,0 +1,150 @@
+"""
+File: model_registry.py
+Description: Process-wide registry of plate models. Each model name is loaded lazily,
+             piece by piece (DataServer files, PlateReconstruction, geometry layers),
+             exactly once per process, with load timings recorded per stage.
+Library: gplately / pyGPlates
+"""
+
+import threading
+import time
+
+#!pip install gplately
+import gplately
+
+
+class PlateModelSession:
+    """
+    One loaded plate model. Every piece is loaded on first access and memoized:
+
+        session.rotation_model, session.topology_features, session.static_polys,
+        session.model (gplately.PlateReconstruction),
+        session.coastlines, session.continents, session.COBs
+
+    Also readable as a dict (session["model"], session.get("COBs")), which is the
+    plate_model shape used by parallel_render, frame_renderer and geometry_cache.
+    """
+
+    KEYS = ("model_name", "model", "rotation_model", "topology_features", "static_polys",
+            "coastlines", "continents", "COBs")
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.timings = {} # stage -> seconds
+        self._lock = threading.RLock()
+        self._data_server = None
+        self._files = None
+        self._geometries = None
+        self._model = None
+
+    def _timed(self, stage, load):
+        start = time.perf_counter()
+        value = load()
+        self.timings[stage] = time.perf_counter() - start
+        return value
+
+    @property
+    def data_server(self):
+        with self._lock:
+            if self._data_server is None:
+                print(f"Initializing {self.model_name} model...")
+                self._data_server = self._timed(
+                    "data_server", lambda: gplately.download.DataServer(self.model_name))
+            return self._data_server
+
+    def _reconstruction_files(self):
+        with self._lock:
+            if self._files is None:
+                self._files = self._timed(
+                    "reconstruction_files", self.data_server.get_plate_reconstruction_files)
+            return self._files
+
+    def _topology_geometries(self):
+        with self._lock:
+            if self._geometries is None:
+                self._geometries = self._timed(
+                    "topology_geometries", self.data_server.get_topology_geometries)
+            return self._geometries
+
+    @property
+    def rotation_model(self):
+        return self._reconstruction_files()[0]
+
+    @property
+    def topology_features(self):
+        return self._reconstruction_files()[1]
+
+    @property
+    def static_polys(self):
+        return self._reconstruction_files()[2]
+
+    @property
+    def coastlines(self):
+        return self._topology_geometries()[0]
+
+    @property
+    def continents(self):
+        return self._topology_geometries()[1]
+
+    @property
+    def COBs(self):
+        return self._topology_geometries()[2]
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                rot_model, topo_features, static_polys = self._reconstruction_files()
+                self._model = self._timed(
+                    "plate_reconstruction",
+                    lambda: gplately.PlateReconstruction(rot_model, topo_features, static_polys))
+            return self._model
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+    def load_all(self):
+        # Eagerly load everything (e.g. before forking render workers)
+        self.model
+        self._topology_geometries()
+        return self
+
+
+class ModelRegistry:
+    # model name -> PlateModelSession, shared by every entry point in the process
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name):
+        with self._lock:
+            if model_name not in self._sessions:
+                self._sessions[model_name] = PlateModelSession(model_name)
+            return self._sessions[model_name]
+
+    def timings(self):
+        # {model_name: {stage: seconds}} for everything loaded so far
+        return {name: dict(session.timings) for name, session in self._sessions.items()}
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+_default_registry = None
+
+def get_model_registry():
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
+
+def get_plate_model(model_name="Merdith2021"):
+    # The shared, lazily loaded session for a model name
+    return get_model_registry().get(model_name)
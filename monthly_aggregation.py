@@ -0,0 +1,98 @@
+"""
+File: monthly_aggregation.py
+Description: Vectorized calendar-month aggregation of daily climate series
+             (sums, means, seasonality CV, driest month, dry-month counts)
+Library: numpy
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Tropical "dry month" threshold used across the transect analyses (mm)
+DRY_MONTH_THRESHOLD = 60.0
+
+# months: datetime64[M] labels; sums/means/counts: (n_points x n_months)
+MonthlyAggregate = namedtuple("MonthlyAggregate", ["months", "sums", "means", "counts"])
+
+
+def as_daily_matrix(values):
+    # Lists with None, 1-D series or 2-D matrices -> float (n_points x n_days), None -> NaN
+    matrix = np.array(values, dtype=float)
+    return matrix[np.newaxis, :] if matrix.ndim == 1 else matrix
+
+
+def month_starts(dates):
+    # Index of the first day of each calendar month in a sorted daily date index
+    months = np.asarray(dates, dtype="datetime64[D]").astype("datetime64[M]")
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    return starts, months[starts]
+
+
+def monthly_aggregate(values, dates):
+    """
+    Calendar-month sums, means and valid-day counts for every point at once.
+    values: (n_points x n_days) or one series; dates: matching daily index.
+    Missing days (None/NaN) are skipped; a month with no valid days is NaN.
+    """
+    matrix = as_daily_matrix(values)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    if matrix.shape[1] != dates.size:
+        raise ValueError(f"{matrix.shape[1]} daily values but {dates.size} dates.")
+
+    starts, months = month_starts(dates)
+    valid = ~np.isnan(matrix)
+
+    # One reduceat pass per statistic over all points and months
+    counts = np.add.reduceat(valid, starts, axis=1)
+    sums = np.add.reduceat(np.where(valid, matrix, 0.0), starts, axis=1)
+
+    empty = counts == 0
+    sums[empty] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return MonthlyAggregate(months, sums, means, counts)
+
+
+def seasonality_cv(monthly_sums):
+    # Coefficient of variation (%) of monthly totals, ignoring missing months;
+    # 0 where the mean is not positive (or no month is available)
+    valid = ~np.isnan(monthly_sums)
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_p = np.where(valid, monthly_sums, 0.0).sum(axis=-1) / n
+        deviation = np.where(valid, monthly_sums - mean_p[..., np.newaxis], 0.0)
+        std_dev = np.sqrt((deviation ** 2).sum(axis=-1) / n)
+        return np.where(mean_p > 0, std_dev / mean_p * 100, 0.0)
+
+
+def driest_month(monthly_sums):
+    # (index, value) of the lowest monthly total per point; (-1, NaN) for all-NaN rows
+    all_missing = np.isnan(monthly_sums).all(axis=-1)
+    filled = np.where(np.isnan(monthly_sums), np.inf, monthly_sums)
+    index = np.argmin(filled, axis=-1)
+    value = np.take_along_axis(filled, index[..., np.newaxis], axis=-1)[..., 0]
+    return np.where(all_missing, -1, index), np.where(all_missing, np.nan, value)
+
+
+def dry_month_count(monthly_sums, threshold=DRY_MONTH_THRESHOLD):
+    # Months below the threshold (missing months are not counted as dry)
+    return np.sum(monthly_sums < threshold, axis=-1)
+
+
+def summarize_precipitation(values, dates, threshold=DRY_MONTH_THRESHOLD):
+    # Everything the transect analyses need, for all points in one call
+    matrix = as_daily_matrix(values)
+    monthly = monthly_aggregate(matrix, dates)
+    driest_index, driest_value = driest_month(monthly.sums)
+    return {
+        "annual_total": np.nansum(matrix, axis=-1),
+        "seasonality_index": seasonality_cv(monthly.sums),
+        # NaT where a point has no valid month
+        "driest_month": np.where(driest_index >= 0, monthly.months[np.maximum(driest_index, 0)],
+                                 np.datetime64("NaT", "M")),
+        "driest_month_mm": driest_value,
+        "dry_months": dry_month_count(monthly.sums, threshold),
+        "valid_days": np.sum(~np.isnan(matrix), axis=-1),
+        "monthly": monthly
+    }
@@ -0,0 +1,80 @@
+"""
+File: paleo_temperature_curve.py
+Description: Precomputed temperature curves over geologic age (anchor table + interpolation)
+Library: numpy
+"""
+
+import numpy as np
+
+# Key anchor points (Age_Ma: Temp_Offset)
+# Anchor points for interpolation (Age_Ma: Temp_Offset_Celsius)
+# Includes high-resolution spikes for PETM and EECO
+GRANULAR_TEMP_ANCHORS = {
+    0: 0.0, 34: 0.5, 52: 12.0, 56: 15.0, 66: 8.0,
+    92: 13.0, 145: 6.0, 201: 9.0, 252: 16.0, 300: -4.0, 360: 2.0,
+    444: -6.0, 520: 10.0, 800: -15.0
+}
+
+# Estimated global mean temperature (GMT) for major climate states.
+# Based on the Veizer et al. and Westerhold et al. climate curves.
+# Age: GMT in Celsius
+GLOBAL_GMT_HISTORY = [
+    (0, 15.0),      # Modern
+    (3, 19.0),      # Pliocene
+    (50, 28.0),     # Eocene Hothouse
+    (66, 23.0),     # K-Pg Boundary
+    (100, 25.0),    # Mid-Cretaceous
+    (150, 22.0),    # Permian-Triassic
+    (360, 14.0),    # Carboniferous (Icehouse)
+    (500, 22.0)     # Cambrian
+]
+
+
+class TempOffsetCurve:
+    """
+    Piecewise-linear temperature curve over age (Ma).
+    The sorted anchor arrays are built once, so each query is a single np.interp.
+    Ages outside the anchor range are clamped to the first/last anchor value.
+    """
+
+    def __init__(self, anchors, name="custom"):
+        # Accept either {age: value} or a list of (age, value) pairs
+        pairs = anchors.items() if hasattr(anchors, "items") else anchors
+        pairs = sorted((float(age), float(value)) for age, value in pairs)
+        if not pairs:
+            raise ValueError("A temperature curve needs at least one anchor point.")
+
+        ages = np.array([p[0] for p in pairs])
+        if np.any(np.diff(ages) == 0):
+            raise ValueError(f"Duplicate anchor ages in '{name}' curve.")
+
+        self.name = name
+        self.ages = ages
+        self.values = np.array([p[1] for p in pairs])
+        # Frozen so a shared curve cannot be edited in place by a caller
+        self.ages.flags.writeable = False
+        self.values.flags.writeable = False
+
+    def __call__(self, age_ma):
+        # Scalar in -> float out, array in -> ndarray out
+        result = np.interp(age_ma, self.ages, self.values)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def __repr__(self):
+        return (f"TempOffsetCurve(name={self.name!r}, anchors={len(self.ages)}, "
+                f"range={self.ages[0]:g}-{self.ages[-1]:g} Ma)")
+
+    def with_anchors(self, anchors, name=None):
+        # Swap in an alternative anchor set, keeping this curve untouched
+        return TempOffsetCurve(anchors, name=name or self.name)
+
+    def relative_to(self, age_ma=0.0, name=None):
+        # Express an absolute curve (e.g. GMT) as an anomaly against a baseline age
+        baseline = self(age_ma)
+        return TempOffsetCurve(zip(self.ages, self.values - baseline),
+                               name=name or f"{self.name}_anomaly")
+
+
+# Shared, precomputed curves
+GRANULAR_TEMP_CURVE = TempOffsetCurve(GRANULAR_TEMP_ANCHORS, name="granular")
+GLOBAL_GMT_CURVE = TempOffsetCurve(GLOBAL_GMT_HISTORY, name="global_gmt")
@@ -0,0 +1,113 @@
+"""
+File: paleoclimate_fields.py
+Description: Whole-grid paleoclimate fields. Applies the point formulas used across the
+             scripts (tecto MAT gradient, polar amplification, Clausius-Clapeyron
+             precipitation scaling) to every cell of a reconstructed global grid at once,
+             returning xarray objects that can be chunked with dask.
+Library: xarray + numpy (+ dask for chunked fields)
+"""
+
+import numpy as np
+import xarray as xr
+
+from paleo_temperature_curve import GLOBAL_GMT_CURVE, GRANULAR_TEMP_CURVE
+from paleolat_grid import get_paleolat_grid
+from trajectory_engine import reconstruct_trajectories
+
+MODERN_GMT = 15.0 # Modern global mean (°C)
+# Fallback annual precipitation used by get_modern_climate (mm)
+DEFAULT_MODERN_PRECIP = 1840.0
+# Roughly 7% increase in moisture per 1°C of warming
+CLAUSIUS_CLAPEYRON = 0.07
+
+
+def modern_grid(resolution=1.0):
+    # Cell-centre latitudes/longitudes of a global grid
+    lats = np.arange(-90 + resolution / 2, 90, resolution)
+    lons = np.arange(-180 + resolution / 2, 180, resolution)
+    return lats, lons
+
+
+def _exact_paleo_lat(ages, lats, lons, model_name):
+    # Exact rotation of every grid cell (eager; one partition, one batched pass)
+    from model_registry import get_plate_model
+    session = get_plate_model(model_name)
+    node_lats, node_lons = (a.ravel() for a in np.meshgrid(lats, lons, indexing="ij"))
+    paleo = reconstruct_trajectories(node_lats, node_lons, ages, session.rotation_model,
+                                     static_polygons=session.static_polys, dtype=np.float32)
+    return np.moveaxis(paleo[..., 0], 1, 0).reshape(ages.size, lats.size, lons.size)
+
+
+def paleo_latitude_field(ages, resolution=1.0, model_name="Merdith2021", grid=None,
+                         chunks=None):
+    """
+    (age, lat, lon) paleo-latitude of every modern grid cell.
+    Uses a prebuilt PaleoLatGrid (lazy and dask-parallel when chunks is given),
+    falling back to exact rotation when no grid has been built for the model.
+    """
+    ages = np.atleast_1d(np.asarray(ages, dtype=float))
+    lats, lons = modern_grid(resolution)
+    coords = {"age": ages, "lat": lats, "lon": lons}
+    grid = grid or get_paleolat_grid(model_name)
+
+    if grid is None:
+        field = xr.DataArray(_exact_paleo_lat(ages, lats, lons, model_name),
+                             coords=coords, dims=("age", "lat", "lon"), name="paleo_lat")
+        return field.chunk(chunks) if chunks else field
+
+    age_da, lat_da, lon_da = xr.broadcast(xr.DataArray(ages, coords={"age": ages}, dims="age"),
+                                          xr.DataArray(lats, coords={"lat": lats}, dims="lat"),
+                                          xr.DataArray(lons, coords={"lon": lons}, dims="lon"))
+    if chunks:
+        age_da, lat_da, lon_da = (a.chunk(chunks) for a in (age_da, lat_da, lon_da))
+
+    field = xr.apply_ufunc(
+        lambda a, la, lo: grid.query(la, lo, a)[..., 0].astype(np.float32),
+        age_da, lat_da, lon_da,
+        dask="parallelized", output_dtypes=[np.float32]
+    )
+    return field.rename("paleo_lat")
+
+
+def paleoclimate_fields(ages, resolution=1.0, model_name="Merdith2021", method="tecto",
+                        modern_precip=DEFAULT_MODERN_PRECIP, grid=None, chunks=None):
+    """
+    Global MAT (°C) and annual precipitation (mm) for the given ages, as an
+    xarray.Dataset with dims (age, lat, lon) and variables mat, precip, paleo_lat.
+
+    method="tecto":     MAT = 28 * cos(paleo_lat) + granular offset(age)
+                        (tecto_bioclimate_engine)
+    method="amplified": MAT = 15 + 12 * cos(lat) + (GMT(age) - 15) * (1 - 0.5 * cos(paleo_lat))
+                        (polar amplification of climate_paleo_data_v3)
+
+    Precipitation scales modern_precip (scalar or a (lat, lon) DataArray) by ~7%
+    per °C of local warming relative to the same formula today.
+    """
+    paleo_lat = paleo_latitude_field(ages, resolution, model_name, grid, chunks)
+    age, lat = paleo_lat["age"], paleo_lat["lat"]
+    cos_paleo = np.cos(np.radians(paleo_lat))
+    cos_modern = np.cos(np.radians(lat))
+
+    # Age-only terms are tiny 1-D arrays, so the curves are evaluated eagerly
+    if method == "tecto":
+        offset = xr.DataArray(GRANULAR_TEMP_CURVE(age.values), coords={"age": age}, dims="age")
+        mat = 28 * cos_paleo + offset
+        modern_mat = 28 * cos_modern
+    elif method == "amplified":
+        global_delta = xr.DataArray(GLOBAL_GMT_CURVE(age.values) - MODERN_GMT,
+                                    coords={"age": age}, dims="age")
+        modern_mat = 15 + 12 * cos_modern
+        mat = modern_mat + global_delta * (1.0 - 0.5 * cos_paleo)
+    else:
+        raise ValueError(f"Unknown MAT method '{method}' (expected 'tecto' or 'amplified').")
+
+    local_delta = mat - modern_mat
+    precip = (modern_precip * (1 + CLAUSIUS_CLAPEYRON * local_delta)).clip(min=0)
+
+    dims = ("age", "lat", "lon")
+    mat, precip = mat.transpose(*dims), precip.transpose(*dims)
+    return xr.Dataset({
+        "mat": mat.astype(np.float32).assign_attrs(units="degC", method=method),
+        "precip": precip.astype(np.float32).assign_attrs(units="mm/yr"),
+        "paleo_lat": paleo_lat.assign_attrs(units="degrees_north", model=model_name)
+    })
@@ -0,0 +1,195 @@
+"""
+File: paleolat_grid.py
+Description: Precomputed paleo-position lookup grid. A build step reconstructs a global
+             modern grid (e.g. 0.5°) at every age step into a memory-mapped float32 cube;
+             queries interpolate unit vectors (bilinear in space, linear in age), and an
+             error report compares the grid against exact rotation.
+Library: numpy (+ trajectory_engine / pygplates for the build and the error report)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from reconstruction_service import dataserver_model_name
+from trajectory_engine import (lat_lon_to_xyz, partition_points, reconstruct_trajectories,
+                               xyz_to_lat_lon)
+
+DEFAULT_GRID_DIR = os.environ.get(
+    "PALEO_LAT_GRID",
+    os.path.join(os.path.expanduser("~"), ".paleo_cache", "paleolat_grid")
+)
+CUBE_FILE = "cube.npy"   # (n_ages, n_lat, n_lon, 2) float32 [paleo_lat, paleo_lon]
+META_FILE = "meta.json"
+
+
+def grid_axes(resolution):
+    # Node latitudes/longitudes; both ends included so no cell wraps the dateline
+    lats = np.linspace(-90.0, 90.0, int(round(180.0 / resolution)) + 1)
+    lons = np.linspace(-180.0, 180.0, int(round(360.0 / resolution)) + 1)
+    return lats, lons
+
+
+def build_paleolat_grid(ages, grid_dir=None, model_name="Merdith2021", resolution=0.5,
+                        rotation_model=None, static_polygons=None, ages_per_chunk=8):
+    """
+    Reconstruct every grid node at every age and write the cube to grid_dir
+    (default: DEFAULT_GRID_DIR/<model_name>). Without rotation_model/static_polygons
+    the model is taken from model_registry. Returns the opened PaleoLatGrid.
+    """
+    model_name = dataserver_model_name(model_name)
+    grid_dir = grid_dir or os.path.join(DEFAULT_GRID_DIR, model_name)
+    ages = np.sort(np.atleast_1d(np.asarray(ages, dtype=float)))
+    if rotation_model is None or static_polygons is None:
+        from model_registry import get_plate_model
+        session = get_plate_model(model_name)
+        rotation_model = rotation_model or session.rotation_model
+        static_polygons = static_polygons or session.static_polys
+
+    # 1. One plate partition for the whole modern grid
+    lats, lons = grid_axes(resolution)
+    node_lats, node_lons = (a.ravel() for a in np.meshgrid(lats, lons, indexing="ij"))
+    plate_ids = partition_points(node_lats, node_lons, static_polygons, rotation_model)
+
+    # 2. Rotate age chunks straight into the memory-mapped cube
+    os.makedirs(grid_dir, exist_ok=True)
+    tmp_path = os.path.join(grid_dir, f"{CUBE_FILE}.tmp")
+    cube = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                     shape=(ages.size, lats.size, lons.size, 2))
+    for start in range(0, ages.size, ages_per_chunk):
+        chunk = ages[start:start + ages_per_chunk]
+        paleo = reconstruct_trajectories(node_lats, node_lons, chunk, rotation_model,
+                                         plate_ids=plate_ids, dtype=np.float32)
+        cube[start:start + chunk.size] = np.moveaxis(paleo, 1, 0).reshape(
+            chunk.size, lats.size, lons.size, 2)
+    cube.flush()
+    del cube
+    os.replace(tmp_path, os.path.join(grid_dir, CUBE_FILE))
+
+    # 3. Metadata next to the cube
+    with open(os.path.join(grid_dir, META_FILE), "w") as f:
+        json.dump({"model_name": model_name, "resolution": resolution,
+                   "ages": ages.tolist()}, f)
+    np.save(os.path.join(grid_dir, "plate_ids.npy"),
+            plate_ids.reshape(lats.size, lons.size).astype(np.int32))
+    return PaleoLatGrid(grid_dir)
+
+
+class PaleoLatGrid:
+    """
+    grid = PaleoLatGrid(grid_dir)
+    grid.paleo_lat(-3.0, -60.0, 100)         -> float
+    grid.query(lats, lons, ages)             -> (..., 2) [paleo_lat, paleo_lon]
+
+    Inputs broadcast against each other. Ages outside the built range are clipped.
+    """
+
+    def __init__(self, grid_dir):
+        with open(os.path.join(grid_dir, META_FILE)) as f:
+            meta = json.load(f)
+        self.grid_dir = grid_dir
+        self.model_name = meta["model_name"]
+        self.resolution = meta["resolution"]
+        self.ages = np.asarray(meta["ages"], dtype=float)
+        self.lats, self.lons = grid_axes(self.resolution)
+        self.cube = np.load(os.path.join(grid_dir, CUBE_FILE), mmap_mode="r")
+
+    def covers(self, age):
+        return self.ages[0] <= age <= self.ages[-1]
+
+    def _bracket(self, values, axis_values, spacing=None):
+        # Lower node index + fractional weight along one axis
+        if spacing is not None:
+            position = (values - axis_values[0]) / spacing
+            index = np.clip(np.floor(position).astype(np.int64), 0, axis_values.size - 2)
+            return index, np.clip(position - index, 0.0, 1.0)
+        values = np.clip(values, axis_values[0], axis_values[-1])
+        if axis_values.size == 1:
+            return np.zeros(values.shape, dtype=np.int64), np.zeros(values.shape)
+        index = np.clip(np.searchsorted(axis_values, values, side="right") - 1,
+                        0, axis_values.size - 2)
+        weight = (values - axis_values[index]) / (axis_values[index + 1] - axis_values[index])
+        return index, weight
+
+    def query(self, lats, lons, ages):
+        lats, lons, ages = np.broadcast_arrays(np.asarray(lats, dtype=float),
+                                               np.asarray(lons, dtype=float),
+                                               np.asarray(ages, dtype=float))
+        lons = (lons + 180.0) % 360.0 - 180.0
+
+        i, wy = self._bracket(lats, self.lats, self.resolution)
+        j, wx = self._bracket(lons, self.lons, self.resolution)
+        k, wt = self._bracket(ages, self.ages)
+        k1 = np.minimum(k + 1, self.ages.size - 1)
+
+        # Weighted sum of the 8 surrounding unit vectors, then renormalize
+        xyz = np.zeros(lats.shape + (3,))
+        for kk, wk in ((k, 1 - wt), (k1, wt)):
+            for ii, wi in ((i, 1 - wy), (i + 1, wy)):
+                for jj, wj in ((j, 1 - wx), (j + 1, wx)):
+                    corner = self.cube[kk, ii, jj].astype(np.float64)
+                    weight = (wk * wi * wj)[..., np.newaxis]
+                    xyz += weight * lat_lon_to_xyz(corner[..., 0], corner[..., 1])
+        xyz /= np.linalg.norm(xyz, axis=-1, keepdims=True)
+        return xyz_to_lat_lon(xyz)
+
+    def paleo_position(self, lat, lon, age):
+        # (paleo_lat, paleo_lon); floats for scalar input, arrays otherwise
+        result = self.query(lat, lon, age)
+        if result.ndim == 1:
+            return float(result[0]), float(result[1])
+        return result[..., 0], result[..., 1]
+
+    def paleo_lat(self, lat, lon, age):
+        return self.paleo_position(lat, lon, age)[0]
+
+
+def error_report(grid, rotation_model, static_polygons, n_samples=2000, seed=0):
+    """
+    Grid vs exact rotation at random (lat, lon, age) samples (ages rounded to 1 Ma).
+    Returns great-circle error stats in km plus the worst paleo-latitude error.
+    """
+    rng = np.random.default_rng(seed)
+    # Uniform on the sphere, so polar cells are not over-sampled
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n_samples)))
+    lons = rng.uniform(-180, 180, n_samples)
+    ages = np.round(rng.uniform(grid.ages[0], grid.ages[-1], n_samples))
+
+    approx = grid.query(lats, lons, ages)
+
+    unique_ages, age_index = np.unique(ages, return_inverse=True)
+    exact_all = reconstruct_trajectories(lats, lons, unique_ages, rotation_model,
+                                         static_polygons=static_polygons)
+    exact = exact_all[np.arange(n_samples), age_index]
+
+    cos_angle = np.clip(np.sum(lat_lon_to_xyz(approx[:, 0], approx[:, 1]) *
+                               lat_lon_to_xyz(exact[:, 0], exact[:, 1]), axis=-1), -1, 1)
+    error_km = 6371.0 * np.arccos(cos_angle)
+    lat_error = np.abs(approx[:, 0] - exact[:, 0])
+    return {
+        "samples": n_samples,
+        "mean_km": float(error_km.mean()),
+        "p50_km": float(np.percentile(error_km, 50)),
+        "p95_km": float(np.percentile(error_km, 95)),
+        "p99_km": float(np.percentile(error_km, 99)),
+        "max_km": float(error_km.max()),
+        # Cells straddling plate boundaries mix plates; these are the outliers
+        "frac_over_100km": float(np.mean(error_km > 100.0)),
+        "max_lat_error_deg": float(lat_error.max()),
+        "p95_lat_error_deg": float(np.percentile(lat_error, 95))
+    }
+
+
+_default_grids = {}
+
+def get_paleolat_grid(model_name="Merdith2021"):
+    # The built grid for a model under DEFAULT_GRID_DIR, or None if not built yet
+    # (gws names like "MULLER2016" resolve to the same grid as "Muller2016")
+    model_name = dataserver_model_name(model_name)
+    if model_name not in _default_grids:
+        grid_dir = os.path.join(DEFAULT_GRID_DIR, model_name)
+        if not os.path.exists(os.path.join(grid_dir, META_FILE)):
+            return None
+        _default_grids[model_name] = PaleoLatGrid(grid_dir)
+    return _default_grids[model_name]
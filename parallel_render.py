@@ -0,0 +1,118 @@
+"""
+File: parallel_render.py
+Description: Renders plate animation frames across a process pool, to PNG files or
+             straight into a VideoSink (video_sink.py). Each worker loads
+             the plate model once at startup; frames arrive fully precomputed
+             (time, titles, marker, trail) so they can be drawn in any order.
+Library: concurrent.futures + matplotlib (+ model_registry / frame_renderer)
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+
+# Shared, lazily loaded plate models (model_registry.py)
+from model_registry import get_plate_model
+# One reusable, blitted figure per worker (frame_renderer.py)
+from frame_renderer import RENDER_STYLES, AnimationFrameRenderer
+from video_sink import VideoSink
+
+DEFAULT_WORKERS = int(os.environ.get("PALEO_RENDER_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+# Everything one frame needs. marker is (lat, lon) or None; trail is (lats, lons)
+# already sliced to this frame (or None); filename keeps the ffmpeg pattern order.
+FrameSpec = namedtuple("FrameSpec", ["filename", "time", "title", "caption", "label",
+                                     "marker", "trail"])
+
+
+# Per-process state, filled once by the pool initializer
+_worker = {}
+
+def _init_worker(model_name, style_name, frame_dir, dpi):
+    # Model, features and one reusable figure per process (forked workers
+    # inherit the parent's already-loaded registry session)
+    plate_model = get_plate_model(model_name)
+    _worker["renderer"] = AnimationFrameRenderer(plate_model, RENDER_STYLES[style_name], dpi)
+    _worker["frame_dir"] = frame_dir
+
+def _close_worker():
+    # In-process runs: release the figure once all frames are done
+    renderer = _worker.pop("renderer", None)
+    if renderer is not None:
+        renderer.close()
+
+def _init_pool_worker(*args):
+    plt.switch_backend("Agg") # Pool workers only ever write files
+    _init_worker(*args)
+
+def _render_one(spec):
+    # One frame -> PNG; returns the file path
+    return _worker["renderer"].save(spec, os.path.join(_worker["frame_dir"], spec.filename))
+
+def _render_one_rgba(spec):
+    # One frame -> raw (height, width, 4) RGBA array for a VideoSink
+    return _worker["renderer"].render(spec)
+
+
+def clean_frame_dir(frame_dir):
+    # Create the folder, or remove PNGs from a previous run so runs don't mix
+    os.makedirs(frame_dir, exist_ok=True)
+    for f in os.listdir(frame_dir):
+        if f.endswith('.png'):
+            os.remove(os.path.join(frame_dir, f))
+
+
+def render_frames_parallel(specs, model_name, frame_dir='animation_frames', style="tracker",
+                           max_workers=DEFAULT_WORKERS, dpi=100):
+    """
+    Render every FrameSpec to frame_dir using up to max_workers processes.
+    Returns the frame paths in spec order (max_workers=1 renders in-process).
+    """
+    specs = list(specs)
+    clean_frame_dir(frame_dir)
+    if not specs:
+        return []
+
+    workers = max(1, min(max_workers, len(specs)))
+    if workers == 1:
+        _init_worker(model_name, style, frame_dir, dpi)
+        try:
+            return [_render_one(spec) for spec in specs]
+        finally:
+            _close_worker()
+
+    # Load once in the parent before the pool starts, then contiguous chunks
+    get_plate_model(model_name).load_all()
+    chunksize = max(1, len(specs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker,
+                             initargs=(model_name, style, frame_dir, dpi)) as pool:
+        return list(pool.map(_render_one, specs, chunksize=chunksize))
+
+
+def render_frames_to_video(specs, model_name, video_path, style="tracker", fps=7,
+                           max_workers=DEFAULT_WORKERS, dpi=100):
+    """
+    Render every FrameSpec and stream the raw RGBA buffers straight into ffmpeg
+    (no PNGs on disk). Frames are encoded in spec order. Returns the sink stats.
+    """
+    specs = list(specs)
+    with VideoSink(video_path, fps=fps) as sink:
+        workers = max(1, min(max_workers, len(specs)))
+        if workers == 1:
+            _init_worker(model_name, style, None, dpi)
+            try:
+                for spec in specs:
+                    sink.write_rgba(_render_one_rgba(spec))
+            finally:
+                _close_worker()
+        else:
+            get_plate_model(model_name).load_all()
+            chunksize = max(1, len(specs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker,
+                                     initargs=(model_name, style, None, dpi)) as pool:
+                # map yields in order as frames complete, so encoding overlaps rendering
+                for frame in pool.map(_render_one_rgba, specs, chunksize=chunksize):
+                    sink.write_rgba(frame)
+    return sink.stats
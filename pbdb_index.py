@@ -0,0 +1,273 @@
+"""
+File: pbdb_index.py
+Description: Local Paleobiology Database occurrence index. An importer turns a PBDB
+             occurrence dump (CSV or JSON, either vocabulary) into a columnar store of
+             .npy arrays with a lat/lon grid index, a geologic-interval table and a
+             taxonomic-class index, so bounding-box / interval queries are answered
+             locally in the same record shape as the PBDB API (tna, cll, ...).
+Library: numpy + pandas (import only)
+"""
+
+import json
+import os
+
+import numpy as np
+
+DEFAULT_INDEX_DIR = os.environ.get(
+    "PALEO_PBDB_INDEX",
+    os.path.join(os.path.expanduser("~"), ".paleo_cache", "pbdb_index")
+)
+META_FILE = "meta.json"
+DEFAULT_CELL_SIZE = 1.0 # Grid cell size (degrees) of the spatial index
+
+# Compact (API JSON) field -> accepted column names in either PBDB vocabulary
+FIELD_ALIASES = {
+    "oid": ("oid", "occurrence_no"),
+    "tna": ("tna", "accepted_name", "identified_name"),
+    "cll": ("cll", "class"),
+    "lng": ("lng",),
+    "lat": ("lat",),
+    "eag": ("eag", "max_ma"),
+    "lag": ("lag", "min_ma"),
+    "oei": ("oei", "early_interval"),
+    "oli": ("oli", "late_interval"),
+}
+STRING_FIELDS = ("tna", "cll", "oei", "oli")
+NUMERIC_FIELDS = {"lng": np.float32, "lat": np.float32, "eag": np.float32, "lag": np.float32}
+
+# ICS bounds (Ma) for intervals commonly passed as interval=...; intervals named in
+# the dump itself are added at import time
+GEOLOGIC_INTERVALS = {
+    "Quaternary": (2.58, 0.0), "Neogene": (23.03, 2.58), "Paleogene": (66.0, 23.03),
+    "Cenozoic": (66.0, 0.0), "Cretaceous": (145.0, 66.0), "Late Cretaceous": (100.5, 66.0),
+    "Early Cretaceous": (145.0, 100.5), "Jurassic": (201.4, 145.0), "Triassic": (251.902, 201.4),
+    "Mesozoic": (251.902, 66.0), "Permian": (298.9, 251.902), "Carboniferous": (358.9, 298.9),
+    "Devonian": (419.2, 358.9), "Silurian": (443.8, 419.2), "Ordovician": (485.4, 443.8),
+    "Cambrian": (538.8, 485.4), "Paleozoic": (538.8, 251.902), "Phanerozoic": (538.8, 0.0),
+}
+
+
+def _read_dump(path):
+    # DataFrame with the compact field names, from a PBDB CSV or JSON download
+    import pandas as pd
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        df = pd.DataFrame(data["records"] if isinstance(data, dict) else data)
+    else:
+        df = pd.read_csv(path, low_memory=False)
+
+    columns = {}
+    for field, aliases in FIELD_ALIASES.items():
+        source = next((a for a in aliases if a in df.columns), None)
+        if source is not None:
+            columns[field] = df[source]
+    missing = {"lng", "lat", "tna"} - set(columns)
+    if missing:
+        raise ValueError(f"PBDB dump {path} has no column for {sorted(missing)}.")
+    out = pd.DataFrame(columns)
+
+    # "occ:12345" (JSON) or 12345 (CSV) -> 12345
+    if "oid" in out:
+        out["oid"] = out["oid"].astype(str).str.replace("occ:", "", regex=False).astype(np.int64)
+    else:
+        out["oid"] = np.arange(len(out), dtype=np.int64)
+    for field in ("eag", "lag"):
+        out[field] = out[field].astype(float) if field in out else np.nan
+    for field in STRING_FIELDS:
+        out[field] = out[field].fillna("").astype(str) if field in out else ""
+    return out.dropna(subset=["lng", "lat"])
+
+
+def _cell_ids(lats, lons, cell_size):
+    n_lon = int(round(360.0 / cell_size))
+    n_lat = int(round(180.0 / cell_size))
+    rows = np.clip(np.floor((lats + 90.0) / cell_size).astype(np.int64), 0, n_lat - 1)
+    cols = np.clip(np.floor((lons + 180.0) / cell_size).astype(np.int64), 0, n_lon - 1)
+    return rows * n_lon + cols
+
+
+def import_pbdb_dump(path, index_dir=None, cell_size=DEFAULT_CELL_SIZE):
+    """
+    Build the local index from a PBDB occurrence dump (e.g. occs/list.csv or
+    occs/list.json with show=class). Rows are stored sorted by grid cell, then
+    occurrence number. Returns the opened PBDBIndex.
+    """
+    index_dir = index_dir or DEFAULT_INDEX_DIR
+    df = _read_dump(path)
+
+    # 1. Spatial order: grid cell, then occurrence number (the API's default order)
+    cells = _cell_ids(df["lat"].to_numpy(float), df["lng"].to_numpy(float), cell_size)
+    order = np.lexsort((df["oid"].to_numpy(), cells))
+    df, cells = df.iloc[order].reset_index(drop=True), cells[order]
+    n_cells = int(round(180.0 / cell_size)) * int(round(360.0 / cell_size))
+    cell_starts = np.searchsorted(cells, np.arange(n_cells + 1))
+
+    # 2. Strings as vocabulary codes
+    os.makedirs(index_dir, exist_ok=True)
+    vocab = {}
+    for field in STRING_FIELDS:
+        codes, uniques = df[field].factorize()
+        vocab[field] = uniques.tolist()
+        np.save(os.path.join(index_dir, f"{field}.npy"), codes.astype(np.int32))
+    for field, dtype in NUMERIC_FIELDS.items():
+        np.save(os.path.join(index_dir, f"{field}.npy"), df[field].to_numpy(dtype))
+    np.save(os.path.join(index_dir, "oid.npy"), df["oid"].to_numpy(np.int64))
+    np.save(os.path.join(index_dir, "cell_starts.npy"), cell_starts.astype(np.int64))
+
+    # 3. Class index: row numbers grouped by class code
+    class_codes = np.load(os.path.join(index_dir, "cll.npy"))
+    class_rows = np.argsort(class_codes, kind="stable")
+    class_starts = np.searchsorted(class_codes[class_rows], np.arange(len(vocab["cll"]) + 1))
+    np.save(os.path.join(index_dir, "class_rows.npy"), class_rows.astype(np.int64))
+    np.save(os.path.join(index_dir, "class_starts.npy"), class_starts.astype(np.int64))
+
+    # 4. Interval table: built-in bounds plus every single-interval age range in the dump
+    intervals = dict(GEOLOGIC_INTERVALS)
+    single = df[(df["oli"] == "") & (df["oei"] != "")]
+    for name, group in single.groupby("oei"):
+        intervals.setdefault(name, (float(group["eag"].max()), float(group["lag"].min())))
+
+    with open(os.path.join(index_dir, META_FILE), "w") as f:
+        json.dump({"cell_size": cell_size, "records": int(len(df)), "source": os.path.abspath(path),
+                   "vocab": vocab, "intervals": intervals}, f)
+    return PBDBIndex(index_dir)
+
+
+class PBDBIndex:
+    """
+    index = PBDBIndex(index_dir)
+    index.query(lngmin, lngmax, latmin, latmax, interval="Cretaceous", limit=10)
+        -> [{"oid": "occ:...", "tna": ..., "cll": ..., "lng": ..., "lat": ..., ...}, ...]
+    index.records(pbdb_params)           -> same, from an occs/list request's params
+    index.query_sites(lats, lons, 0.5)   -> one record list per site
+    """
+
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, META_FILE)) as f:
+            meta = json.load(f)
+        self.index_dir = index_dir
+        self.cell_size = meta["cell_size"]
+        self.vocab = meta["vocab"]
+        self.intervals = {name: tuple(bounds) for name, bounds in meta["intervals"].items()}
+        self._class_code = {name: code for code, name in enumerate(self.vocab["cll"])}
+        self.n_lat = int(round(180.0 / self.cell_size))
+        self.n_lon = int(round(360.0 / self.cell_size))
+
+        load = lambda name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+        self.columns = {field: load(field) for field in
+                        ("oid", "lng", "lat", "eag", "lag") + STRING_FIELDS}
+        self.cell_starts = load("cell_starts")
+        self.class_rows, self.class_starts = load("class_rows"), load("class_starts")
+
+    def __len__(self):
+        return int(self.columns["oid"].size)
+
+    # --- Indexes ---
+
+    def _bbox_rows(self, lngmin, lngmax, latmin, latmax):
+        # Candidate rows from the grid cells overlapping the box, then the exact test
+        row0 = max(int(np.floor((latmin + 90.0) / self.cell_size)), 0)
+        row1 = min(int(np.floor((latmax + 90.0) / self.cell_size)), self.n_lat - 1)
+        col0 = max(int(np.floor((lngmin + 180.0) / self.cell_size)), 0)
+        col1 = min(int(np.floor((lngmax + 180.0) / self.cell_size)), self.n_lon - 1)
+        if row0 > row1 or col0 > col1:
+            return np.empty(0, dtype=np.int64)
+
+        # Cells in one grid row are contiguous, so each grid row is a single slice
+        rows = np.concatenate([
+            np.arange(self.cell_starts[r * self.n_lon + col0],
+                      self.cell_starts[r * self.n_lon + col1 + 1])
+            for r in range(row0, row1 + 1)
+        ])
+        lat, lng = self.columns["lat"][rows], self.columns["lng"][rows]
+        inside = (lat >= latmin) & (lat <= latmax) & (lng >= lngmin) & (lng <= lngmax)
+        return rows[inside]
+
+    def class_rows_for(self, classes):
+        # Rows of the given taxonomic classes (sorted)
+        slices = [self.class_rows[self.class_starts[code]:self.class_starts[code + 1]]
+                  for code in (self._class_code.get(c) for c in classes) if code is not None]
+        return np.sort(np.concatenate(slices)) if slices else np.empty(0, dtype=np.int64)
+
+    def interval_bounds(self, interval):
+        # (max_ma, min_ma) of a named interval
+        if interval not in self.intervals:
+            raise ValueError(f"Unknown interval '{interval}'.")
+        return self.intervals[interval]
+
+    def _time_mask(self, rows, max_ma, min_ma, timerule):
+        # PBDB timerules: contain, overlap, major (>= 50% of the age range inside)
+        eag, lag = self.columns["eag"][rows], self.columns["lag"][rows]
+        if timerule == "contain":
+            return (eag <= max_ma) & (lag >= min_ma)
+        overlap = np.minimum(eag, max_ma) - np.maximum(lag, min_ma)
+        if timerule == "overlap":
+            return overlap > 0
+        if timerule == "major":
+            span = eag - lag
+            return np.where(span > 0, overlap >= 0.5 * span, (eag <= max_ma) & (lag >= min_ma))
+        raise ValueError(f"Unknown timerule '{timerule}' (expected contain, overlap or major).")
+
+    # --- Queries ---
+
+    def query(self, lngmin=-180.0, lngmax=180.0, latmin=-90.0, latmax=90.0, interval=None,
+              max_ma=None, min_ma=None, classes=None, limit=None, timerule="major"):
+        if classes and (lngmin, lngmax, latmin, latmax) == (-180.0, 180.0, -90.0, 90.0):
+            rows = self.class_rows_for(classes)
+        else:
+            rows = self._bbox_rows(lngmin, lngmax, latmin, latmax)
+            if classes:
+                codes = [self._class_code[c] for c in classes if c in self._class_code]
+                rows = rows[np.isin(self.columns["cll"][rows], codes)]
+
+        if interval is not None:
+            max_ma, min_ma = self.interval_bounds(interval)
+        if max_ma is not None or min_ma is not None:
+            max_ma = np.inf if max_ma is None else max_ma
+            min_ma = 0.0 if min_ma is None else min_ma
+            rows = rows[self._time_mask(rows, max_ma, min_ma, timerule)]
+
+        # Occurrence-number order, like the API
+        rows = rows[np.argsort(self.columns["oid"][rows], kind="stable")]
+        return self._records(rows[:limit] if limit else rows)
+
+    def _records(self, rows):
+        columns = {field: self.columns[field][rows] for field in self.columns}
+        records = []
+        for i in range(rows.size):
+            record = {"oid": f"occ:{columns['oid'][i]}"}
+            for field in STRING_FIELDS:
+                value = self.vocab[field][columns[field][i]]
+                if value:
+                    record[field] = value
+            for field in ("lng", "lat", "eag", "lag"):
+                record[field] = round(float(columns[field][i]), 5)
+            records.append(record)
+        return records
+
+    def records(self, params):
+        # Answer an occs/list.json params dict (lngmin/lngmax/latmin/latmax, interval, limit)
+        return self.query(params.get("lngmin", -180.0), params.get("lngmax", 180.0),
+                          params.get("latmin", -90.0), params.get("latmax", 90.0),
+                          interval=params.get("interval"),
+                          max_ma=params.get("max_ma"), min_ma=params.get("min_ma"),
+                          limit=params.get("limit"), timerule=params.get("timerule", "major"))
+
+    def query_sites(self, lats, lons, half_width=0.5, **kwargs):
+        # One ±half_width box query per site, in input order
+        return [self.query(lon - half_width, lon + half_width, lat - half_width, lat + half_width,
+                           **kwargs)
+                for lat, lon in zip(np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))]
+
+
+_default_index = None
+
+def get_pbdb_index():
+    # The imported index under DEFAULT_INDEX_DIR, or None if no dump has been imported
+    global _default_index
+    if _default_index is None:
+        if not os.path.exists(os.path.join(DEFAULT_INDEX_DIR, META_FILE)):
+            return None
+        _default_index = PBDBIndex(DEFAULT_INDEX_DIR)
+    return _default_index
@@ -13,6 +13,14 @@ import gplately.download
 
 import inspect
 
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+
+# Shared plate model registry (model_registry.py)
+from model_registry import get_plate_model
+# Cached reconstructed coastlines/continents/COBs (geometry_cache.py)
+from geometry_cache import get_geometry_cache, plot_layer
+
 """
 # In latest version, server is called RemoteModelServer
 try:
@@ -36,17 +44,22 @@ except AttributeError:
 
 model_name = "Merdith2021"
 
-data_server = gplately.download.DataServer(model_name)
+# The registry loads the DataServer files once per process and memoizes them,
+# so re-running this cell (or the tracker/animation in the same session) is free
+session = get_plate_model(model_name)
 
 # Get the core construction files
-rot_model, topo_features, static_polys = data_server.get_plate_reconstruction_files()
+rot_model, topo_features, static_polys = (session.rotation_model, session.topology_features,
+                                          session.static_polys)
 
 # Create the PlateReconstruction object
 
-model = gplately.PlateReconstruction(rot_model, topo_features, static_polys)
+model = session.model
 
 # Get the visual geometries (Coastlines/Continents)
-coastlines, continents, COBs = data_server.get_topology_geometries()
+coastlines, continents, COBs = session.coastlines, session.continents, session.COBs
+
+print(f"Model load timings (s): {session.timings}")
 
 # SAFETY CHECK: If a model doesn't provide continents/coastlines, 
 # we create an empty FeatureCollection so the plotter doesn't crash.
@@ -59,15 +72,8 @@ if continents is None:
 time = 250
 
 # Setup the plotter
-# Note: PlotTopologies requires the model, time, and the feature collections
-
-try:
-    gPlot = gplately.PlotTopologies(model, time=time, continents=continents, 
-                                coastlines=coastlines, COBs=COBs)
-except TypeError:
-    # If that fails, try without COBs - some versions only take 4 arguments
-    gplot = gplately.PlotTopologies(model, time=time, continents=continents, 
-                                    coastlines=coastlines)
+# Layers are drawn from the geometry cache below instead of gplately.PlotTopologies,
+# which would reconstruct continents/coastlines/COBs again on every run
 
 print(inspect.signature(gplately.PlotTopologies.__init__))
 # (self, plate_reconstruction, coastlines=None, continents=None, COBs=None, 
@@ -84,20 +90,22 @@ ax.set_global()
 ax.set_facecolor('#f0f8ff') # Light Alice Blue for oceans
 ax.gridlines(draw_labels=False, linewidth=0.5, color='gray', alpha=0.5, linestyle='--')
 
-# Plotting the layers with safety checks
-# Check if gPlot has the methods before calling them
+# Plotting the layers from the geometry cache: reconstructed once per
+# (model, time, anchor plate, layer) and reused by later maps/animations
+layers = get_geometry_cache().get_layers(
+    {"model_name": model_name, "model": model, "continents": continents,
+     "coastlines": coastlines, "COBs": COBs},
+    time
+)
 
-# Check for Continent Polygons (The "Land" Color)
-if hasattr(gPlot, 'plot_continents'):
-  gPlot.plot_continents(ax, facecolor='#e6ccb2', edgecolor='none', alpha=0.8)
+# Continent Polygons (The "Land" Color)
+plot_layer(ax, layers["continents"], facecolor='#e6ccb2', alpha=0.8)
 
-# Check for COBs (The Continental Shelves)
-if hasattr(gPlot, 'plot_cobs'):
-    gPlot.plot_cobs(ax, color='#1f77b4', linewidth=0.7, alpha=0.4)
+# COBs (The Continental Shelves)
+plot_layer(ax, layers["COBs"], edgecolor='#1f77b4', linewidth=0.7, alpha=0.4)
 
-# Check for Coastlines (modern reference lines)
-if hasattr(gPlot, 'plot_coastlines'):
-  gPlot.plot_coastlines(ax, color='#222222', linewidth=0.5)
+# Coastlines (modern reference lines)
+plot_layer(ax, layers["coastlines"], edgecolor='#222222', linewidth=0.5)
 
 # Add a paleo-equator for orientation
 # This uses standard matplotlib/cartopy logic (independent of gPlot)
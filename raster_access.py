@@ -0,0 +1,94 @@
+"""
+File: raster_access.py
+Description: Lazy, tile-aligned access to Cloud Optimized GeoTIFFs (SRTM, WorldClim).
+             Rasters open as dask arrays chunked on the file's internal tiles, so a
+             bounding-box clip only reads the tiles it intersects (HTTP range requests
+             for remote COGs), and overview levels are picked automatically for plots.
+Library: rioxarray + rasterio (+ dask)
+"""
+
+import os
+
+import rioxarray
+import rasterio
+
+# Internal tiles per dask chunk side (512x512 tiles -> 2048x2048 chunks)
+DEFAULT_TILES_PER_CHUNK = int(os.environ.get("PALEO_RASTER_TILES_PER_CHUNK", 4))
+
+
+def raster_layout(path):
+    # Size, internal block shape and overview factors, from the header only
+    with rasterio.open(path) as src:
+        return {
+            "width": src.width,
+            "height": src.height,
+            "count": src.count,
+            "block_shape": src.block_shapes[0], # (rows, cols)
+            "overviews": src.overviews(1), # e.g. [2, 4, 8, 16]
+            "bounds": src.bounds,
+            "crs": src.crs
+        }
+
+
+def open_cog(path, overview_level=None, tiles_per_chunk=DEFAULT_TILES_PER_CHUNK,
+             masked=False, layout=None):
+    """
+    Open a (COG) raster lazily: no pixels are read until values are computed.
+    Dask chunks are whole multiples of the internal tiles, so every chunk maps
+    to complete tile reads. overview_level selects a reduced-resolution level
+    (index into the file's overviews; None = full resolution).
+    """
+    layout = layout or raster_layout(path)
+    block_rows, block_cols = layout["block_shape"]
+    chunks = {"band": 1, "y": block_rows * tiles_per_chunk, "x": block_cols * tiles_per_chunk}
+    return rioxarray.open_rasterio(path, chunks=chunks, overview_level=overview_level,
+                                   masked=masked, lock=False)
+
+
+def _bbox_pixels(layout, bbox):
+    # Approximate full-resolution pixel extent of a bbox (whole raster if None)
+    if bbox is None:
+        return layout["width"], layout["height"]
+    bounds = layout["bounds"]
+    minx, miny, maxx, maxy = bbox
+    fx = (min(maxx, bounds.right) - max(minx, bounds.left)) / (bounds.right - bounds.left)
+    fy = (min(maxy, bounds.top) - max(miny, bounds.bottom)) / (bounds.top - bounds.bottom)
+    return max(1, int(layout["width"] * max(fx, 0))), max(1, int(layout["height"] * max(fy, 0)))
+
+
+def choose_overview_level(layout, target_size, bbox=None):
+    """
+    Coarsest overview that still gives at least target_size=(width, height)
+    pixels over the bbox. Returns None (full resolution) if none qualifies.
+    """
+    width, height = _bbox_pixels(layout, bbox)
+    target_width, target_height = target_size
+    level = None
+    for index, factor in enumerate(layout["overviews"]):
+        if width / factor >= target_width and height / factor >= target_height:
+            level = index
+    return level
+
+
+def read_bbox(path, minx, miny, maxx, maxy, target_size=None, **kwargs):
+    """
+    Lazy clip to a bounding box (in the raster CRS). Only the intersecting tiles
+    are read when the result is computed or plotted. With target_size=(w, h)
+    (e.g. figure inches * dpi) the matching overview level is used instead.
+    """
+    layout = raster_layout(path)
+    level = None
+    if target_size is not None:
+        level = choose_overview_level(layout, target_size, (minx, miny, maxx, maxy))
+    data = open_cog(path, overview_level=level, layout=layout, **kwargs)
+    return data.rio.clip_box(minx=minx, miny=miny, maxx=maxx, maxy=maxy)
+
+
+def open_for_plot(path, figsize=(10, 5), dpi=100, bbox=None, **kwargs):
+    # Raster (or bbox clip) at the overview level matching the figure size
+    target_size = (int(figsize[0] * dpi), int(figsize[1] * dpi))
+    if bbox is not None:
+        return read_bbox(path, *bbox, target_size=target_size, **kwargs)
+    layout = raster_layout(path)
+    return open_cog(path, overview_level=choose_overview_level(layout, target_size),
+                    layout=layout, **kwargs)
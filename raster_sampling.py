@@ -0,0 +1,172 @@
+"""
+File: raster_sampling.py
+Description: Bulk point sampling of bioclimate / elevation rasters. Coordinates are turned
+             into pixel positions with one vectorized inverse affine transform, only the
+             raster blocks that contain points are read, and values come back as one
+             column in the input order (nearest or bilinear).
+Library: rasterio (file sampling), rioxarray DataArrays (lazy sampling) + numpy
+"""
+
+import os
+
+import numpy as np
+
+# Local DEM (e.g. SRTM / GMTED GeoTIFF or COG) used in place of the open-elevation API
+ELEVATION_RASTER = os.environ.get("PALEO_ELEVATION_RASTER")
+
+METHODS = ("nearest", "bilinear")
+
+
+def pixel_positions(transform, xs, ys):
+    """
+    Fractional (row, col) of each coordinate relative to pixel centres, in one
+    vectorized pass of the inverse affine transform. Coordinates must be in the
+    raster CRS (lon/lat for SRTM and WorldClim).
+    """
+    inverse = ~transform
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    cols = inverse.a * xs + inverse.b * ys + inverse.c - 0.5
+    rows = inverse.d * xs + inverse.e * ys + inverse.f - 0.5
+    return rows, cols
+
+
+def _neighbours(rows, cols, method, height, width):
+    # (n, k) integer pixel indices, (n, k) weights and an in-bounds mask per point
+    if method == "nearest":
+        r = np.floor(rows + 0.5).astype(np.int64)[:, np.newaxis]
+        c = np.floor(cols + 0.5).astype(np.int64)[:, np.newaxis]
+        weights = np.ones(r.shape)
+    elif method == "bilinear":
+        r0 = np.floor(rows).astype(np.int64)
+        c0 = np.floor(cols).astype(np.int64)
+        wr, wc = rows - r0, cols - c0
+        r = np.stack([r0, r0, r0 + 1, r0 + 1], axis=1)
+        c = np.stack([c0, c0 + 1, c0, c0 + 1], axis=1)
+        weights = np.stack([(1 - wr) * (1 - wc), (1 - wr) * wc, wr * (1 - wc), wr * wc], axis=1)
+    else:
+        raise ValueError(f"Unknown sampling method '{method}' (expected one of {METHODS}).")
+
+    # Points in the outer half-pixel use the edge pixels
+    inside = (rows >= -0.5) & (rows < height - 0.5) & (cols >= -0.5) & (cols < width - 0.5)
+    return np.clip(r, 0, height - 1), np.clip(c, 0, width - 1), weights, inside
+
+
+def _combine(values, weights, inside):
+    # Weighted sum over neighbours, skipping nodata; NaN outside the raster
+    valid = ~np.isnan(values)
+    weights = np.where(valid, weights, 0.0)
+    total = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = (np.where(valid, values, 0.0) * weights).sum(axis=1) / total
+    result[(total == 0) | ~inside] = np.nan
+    return result
+
+
+class RasterSampler:
+    """
+    with RasterSampler("wc2.1_30s_bio_1.tif") as sampler:
+        bio1 = sampler.sample(lons, lats, method="bilinear")   -> (n,) float64
+
+    Keeps the dataset open across calls; each call reads every touched block once.
+    """
+
+    def __init__(self, path, band=1):
+        # Imported here so the scripts run without rasterio until a raster is sampled
+        import rasterio
+        from rasterio.windows import Window
+        self._window = Window
+        self.src = rasterio.open(path)
+        self.band = band
+        self.block_rows, self.block_cols = self.src.block_shapes[band - 1]
+
+    def _read_pixels(self, r, c):
+        # Values at integer pixel indices, grouped so each block is read exactly once
+        flat_r, flat_c = r.ravel(), c.ravel()
+        n_block_cols = -(-self.src.width // self.block_cols)
+        block_id = (flat_r // self.block_rows) * n_block_cols + flat_c // self.block_cols
+        order = np.argsort(block_id, kind="stable")
+        blocks, starts = np.unique(block_id[order], return_index=True)
+        ends = np.append(starts[1:], order.size)
+
+        values = np.empty(flat_r.size)
+        for block, start, end in zip(blocks, starts, ends):
+            index = order[start:end]
+            row_off = (block // n_block_cols) * self.block_rows
+            col_off = (block % n_block_cols) * self.block_cols
+            window = self._window(col_off, row_off,
+                                  min(self.block_cols, self.src.width - col_off),
+                                  min(self.block_rows, self.src.height - row_off))
+            data = self.src.read(self.band, window=window, masked=True)
+            data = data.astype(np.float64).filled(np.nan)
+            values[index] = data[flat_r[index] - row_off, flat_c[index] - col_off]
+        return values.reshape(r.shape)
+
+    def sample(self, lons, lats, method="nearest"):
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        rows, cols = pixel_positions(self.src.transform, lons, lats)
+        r, c, weights, inside = _neighbours(rows, cols, method, self.src.height, self.src.width)
+        return _combine(self._read_pixels(r, c), weights, inside)
+
+    def close(self):
+        self.src.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def sample_dataarray(data, lons, lats, method="nearest", band=1):
+    """
+    Sample a rioxarray DataArray (e.g. from raster_access.open_cog). Pixels are
+    picked with one vectorized isel, so a dask-backed array only loads the chunks
+    that contain points.
+    """
+    import xarray as xr
+    if "band" in data.dims:
+        data = data.sel(band=band)
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    y_dim, x_dim = data.rio.y_dim, data.rio.x_dim
+    rows, cols = pixel_positions(data.rio.transform(), lons, lats)
+    r, c, weights, inside = _neighbours(rows, cols, method, data.sizes[y_dim], data.sizes[x_dim])
+
+    picked = data.isel({y_dim: xr.DataArray(r, dims=("point", "k")),
+                        x_dim: xr.DataArray(c, dims=("point", "k"))})
+    values = picked.astype(np.float64).values
+    nodata = data.rio.nodata
+    if nodata is not None and not np.isnan(nodata):
+        values[values == nodata] = np.nan
+    return _combine(values, weights, inside)
+
+
+def sample_points(source, lons, lats, method="nearest", band=1):
+    """
+    Raster values at (lon, lat) points, aligned with the input order (NaN for
+    nodata or points outside the raster). source is a file path/URL or a
+    rioxarray DataArray.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with RasterSampler(source, band) as sampler:
+            return sampler.sample(lons, lats, method)
+    return sample_dataarray(source, lons, lats, method, band)
+
+
+_elevation_sampler = None
+
+def local_elevation(lat, lon, method="bilinear"):
+    """
+    Modern elevation (m) from the local DEM at PALEO_ELEVATION_RASTER.
+    Returns None when no DEM is configured so callers can fall back to the API;
+    a float for scalar input, an array otherwise (NaN outside the DEM).
+    """
+    global _elevation_sampler
+    if not ELEVATION_RASTER:
+        return None
+    if _elevation_sampler is None:
+        _elevation_sampler = RasterSampler(ELEVATION_RASTER)
+    elevation = _elevation_sampler.sample(lon, lat, method)
+    return float(elevation[0]) if np.ndim(lat) == 0 and np.ndim(lon) == 0 else elevation
@@ -0,0 +1,168 @@
+"""
+File: reconstruction_service.py
+Description: Point reconstruction with the same query shape as the GPlates web service
+             (points, time, model -> {"coordinates": [[lon, lat], ...]}), answered either
+             in-process from the model's rotation files (local) or by gws.gplates.org
+             (remote). Both accept many points per request.
+Library: pygplates via trajectory_engine / model_registry (local), requests (remote)
+"""
+
+import os
+
+import numpy as np
+
+from http_cache import cached_get
+from trajectory_engine import partition_points, reconstruct_trajectories
+
+# "local" (in-process pygplates) or "remote" (gws.gplates.org)
+DEFAULT_BACKEND = os.environ.get("PALEO_RECON_BACKEND", "local").lower()
+
+GWS_RECONSTRUCT_URL = "https://gws.gplates.org/reconstruct/reconstruct_points/"
+# Points per remote request (keeps the query string a sane length)
+GWS_MAX_POINTS = 200
+
+# GPlates web service model names -> gplately DataServer model names
+MODEL_ALIASES = {
+    "MULLER2016": "Muller2016",
+    "MULLER2019": "Muller2019",
+    "MERDITH2021": "Merdith2021",
+    "SETON2012": "Seton2012",
+    "MATTHEWS2016": "Matthews2016",
+}
+
+
+def dataserver_model_name(model):
+    # "MULLER2016" (gws) or "Muller2016" (DataServer) -> "Muller2016"
+    return MODEL_ALIASES.get(model.upper(), model)
+
+
+def _as_points(points):
+    # (lon, lat) pairs (gws order) -> float arrays lons, lats
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    return points[:, 0], points[:, 1]
+
+
+def _multipoint(lons, lats):
+    return {"type": "MultiPoint",
+            "coordinates": [[float(lon), float(lat)] for lon, lat in zip(lons, lats)]}
+
+
+class LocalReconstructionBackend:
+    """
+    In-process reconstruction from the plate model files (loaded once per process by
+    model_registry). Plate IDs are memoized per model and point, so repeat queries
+    for the same sites only cost the rotation.
+    """
+
+    name = "local"
+
+    def __init__(self, precision=6):
+        self.precision = precision
+        self._plate_ids = {} # (model, lat, lon) -> plate ID
+
+    def _session(self, model):
+        # Imported here so the remote backend works without gplately installed
+        from model_registry import get_plate_model
+        return get_plate_model(dataserver_model_name(model))
+
+    def _plate_ids_for(self, session, model, lons, lats):
+        keys = [(model, round(lat, self.precision), round(lon, self.precision))
+                for lon, lat in zip(lons, lats)]
+        missing = [i for i, key in enumerate(keys) if key not in self._plate_ids]
+        if missing:
+            found = partition_points(lats[missing], lons[missing], session.static_polys,
+                                     session.rotation_model)
+            for i, plate_id in zip(missing, found):
+                self._plate_ids[keys[i]] = plate_id
+        return np.array([self._plate_ids[key] for key in keys], dtype=np.int64)
+
+    def reconstruct(self, lons, lats, time, model):
+        if lons.size == 0:
+            return lons, lats
+        session = self._session(model)
+        plate_ids = self._plate_ids_for(session, model, lons, lats)
+        paleo = reconstruct_trajectories(lats, lons, [time], session.rotation_model,
+                                         plate_ids=plate_ids)[:, 0]
+        return paleo[:, 1], paleo[:, 0]
+
+
+class RemoteReconstructionBackend:
+    # gws.gplates.org multipoint requests (through the shared on-disk response cache)
+
+    name = "remote"
+
+    def __init__(self, url=GWS_RECONSTRUCT_URL, max_points=GWS_MAX_POINTS, get=cached_get,
+                 **request_kwargs):
+        self.url = url
+        self.max_points = max_points
+        self.get = get
+        self.request_kwargs = request_kwargs # e.g. verify=False, timeout=10
+
+    def reconstruct(self, lons, lats, time, model):
+        out_lons, out_lats = [], []
+        for start in range(0, lons.size, self.max_points):
+            chunk = slice(start, start + self.max_points)
+            params = {
+                "points": ",".join(f"{lon},{lat}" for lon, lat in zip(lons[chunk], lats[chunk])),
+                "time": time,
+                "model": model
+            }
+            response = self.get(self.url, params=params, **self.request_kwargs)
+            response.raise_for_status()
+            coordinates = np.asarray(response.json()["coordinates"], dtype=float).reshape(-1, 2)
+            out_lons.append(coordinates[:, 0])
+            out_lats.append(coordinates[:, 1])
+
+        if not out_lons:
+            return lons, lats
+        return np.concatenate(out_lons), np.concatenate(out_lats)
+
+
+BACKENDS = {"local": LocalReconstructionBackend, "remote": RemoteReconstructionBackend}
+
+
+class ReconstructionService:
+    """
+    service.reconstruct_points([(lon, lat), ...], time, model) -> gws-style dict
+    service.reconstruct_point(lon, lat, time, model)           -> (p_lon, p_lat)
+    """
+
+    def __init__(self, backend=DEFAULT_BACKEND):
+        self.set_backend(backend)
+
+    def set_backend(self, backend):
+        # A backend name ("local"/"remote") or a backend instance
+        if isinstance(backend, str):
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown reconstruction backend '{backend}' "
+                                 f"(expected one of {sorted(BACKENDS)}).")
+            backend = BACKENDS[backend]()
+        self.backend = backend
+
+    def reconstruct_points(self, points, time, model="MULLER2016"):
+        lons, lats = _as_points(points)
+        p_lons, p_lats = self.backend.reconstruct(lons, lats, float(time), model)
+        return _multipoint(p_lons, p_lats)
+
+    def reconstruct_point(self, lon, lat, time, model="MULLER2016"):
+        p_lon, p_lat = self.reconstruct_points([(lon, lat)], time, model)["coordinates"][0]
+        return p_lon, p_lat
+
+
+_default_service = None
+
+def get_reconstruction_service():
+    # Process-wide service; backend from PALEO_RECON_BACKEND (default: local)
+    global _default_service
+    if _default_service is None:
+        _default_service = ReconstructionService()
+    return _default_service
+
+def set_reconstruction_backend(backend):
+    get_reconstruction_service().set_backend(backend)
+
+def reconstruct_points(points, time, model="MULLER2016"):
+    return get_reconstruction_service().reconstruct_points(points, time, model)
+
+def reconstruct_point(lon, lat, time, model="MULLER2016"):
+    return get_reconstruction_service().reconstruct_point(lon, lat, time, model)
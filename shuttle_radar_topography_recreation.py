@@ -4,6 +4,11 @@ import rioxarray
 #!pip install geemap
 import geemap
 
+import numpy as np
+import matplotlib.pyplot as plt
+
+from raster_access import open_cog, open_for_plot
+
 # geemap has a sample cloud optimized GeoTIFF (COG) that can be used to practice spatial logic
 
 url = 'https://github.com/giswqs/data/raw/main/raster/srtm90.tif' 
@@ -11,8 +16,9 @@ url = 'https://github.com/giswqs/data/raw/main/raster/srtm90.tif'
 # read the file in the url into rioxarray
 # finds the coordinate reference system (CRS), cell size, and "No Data" values
 # the output is a 3D object with dimensions (band, y, x)
+# open_cog is lazy: only the header is read here, pixels are fetched tile by tile when needed
 
-data = rioxarray.open_rasterio(url)
+data = open_cog(url)
 
 # verify this
 print(np.shape(data)) # (1, 2456, 4269)
@@ -34,7 +40,9 @@ plt.figure(figsize=(10, 5)) # figsize=(10, 5) means ten inches wide, five inches
 # cmap sets colormap. For elevation, 'terrain' can be used. For climate, Red/Blue 'RdBu_r' can be used.
 # Here only terrain data is displayed from url, so it makes sense to use 'terrain' colormap.
 
-data.sel(band=1).plot(cmap = 'terrain')
+# open_for_plot reads the overview level matching the figure size instead of every full-resolution pixel
+plot_data = open_for_plot(url, figsize=(10, 5))
+plot_data.sel(band=1).plot(cmap = 'terrain')
 plt.title('Use Sample Data to Build Project Logic')
 plt.show()
 
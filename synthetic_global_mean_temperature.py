@@ -1,6 +1,9 @@
 import matplotlib.pyplot as plt
 import xarray as xr
 
+# Lazy (scenario, lat, lon) warming/cooling cube (scenario_cube.py)
+from scenario_cube import ScenarioCube
+
 # 1. Create a grid of latitudes and longitudes
 lats = np.linspace(-90, 90, 180)
 lons = np.linspace(-180, 180, 360)
@@ -46,9 +49,19 @@ min_temp = -10
 max_temp = 45
 
 # From the Severe Icehouse Climate of the Last Glacial Maximum (-6°C colder than preindustrial at its peak) to the Hothouse Climate PETM (up to 12°C warmer than preindustrial at its peak)
-for i in range(-6, 13, 1):
-  print(f'Create a {i}°C scenario')
-  scenario = bio1_fake + i
+# All scenarios live in one lazy (scenario, lat, lon) cube: bio1_fake broadcast
+# against the offsets, so no scenario is copied until it is actually plotted
+icehouse_to_hothouse = ScenarioCube(bio1_fake, range(-6, 13, 1))
+
+# Scenario statistics straight from the cube (no loop over scenarios)
+global_means = icehouse_to_hothouse.area_weighted_mean()
+hot_fraction = icehouse_to_hothouse.exceedance_fraction(30.0)
+for i, mean_t, frac in zip(global_means["scenario"].values, global_means.values, hot_fraction.values):
+  print(f'{i:+.0f}°C scenario: area-weighted mean {mean_t:.2f}°C, '
+        f'{frac * 100:.1f}% of the globe above 30°C')
+
+for i in icehouse_to_hothouse.offsets.values:
+  scenario = icehouse_to_hothouse.data.sel(scenario=i)
 
   # Initialize the figure
   plt.figure(figsize=(12, 5))
@@ -58,12 +71,11 @@ for i in range(-6, 13, 1):
   scenario.plot(cmap='RdBu_r', vmin=min_temp, vmax=max_temp)
     
   # Formatting the title and labels
-  plt.title(f'Bioclimatic Scenario: Annual Mean Temperature ({i}°C)')
   plt.xlabel("Longitude")
   plt.ylabel("Latitude")
     
   # Show the plot for this specific iteration
-  plt.title(f'Future Scenario: Annual Mean Temperature ({i}°C)')
+  plt.title(f'Future Scenario: Annual Mean Temperature ({i:g}°C)')
   plt.show()
 
 
@@ -71,26 +83,14 @@ for i in range(-6, 13, 1):
 # Subplot would be even more concise and save space
 ###
 
-# Create the figure and a 3x6 grid of subplots
-fig, axes = plt.subplots(4, 5, figsize=(24, 12))
-axes = axes.flatten()  # Turn the 4x5 matrix into a simple list of 20 spots
+# One 4x5 facet grid rendered from a single cube
 # Go up to 13°C warmer than preindustrial to cover all 4x5 spots
+sensitivity = ScenarioCube(bio1_fake, range(-6, 14, 1))
 
-# Loop through 18 scenarios (from -6 to +13)
-for idx, i in enumerate(range(-6, 14, 1)):
-    scenario = bio1_fake + i
-    ax = axes[idx]
-    
-    # Plot onto the specific subplot (ax=ax)
-    # add_colorbar=False keeps the layout clean; we can add one big one later
-    scenario.plot(ax=ax, cmap='RdBu_r', vmin=min_temp, vmax=max_temp, add_colorbar=False)
-    
-    # Clean up the subplots
-    ax.set_title(f'Scenario: {i}°C', fontsize=10)
-    ax.set_xticks([]) # Remove coordinates to save space
-    ax.set_yticks([])
-    ax.set_xlabel('')
-    ax.set_ylabel('')
+# add_colorbar=False keeps the layout clean; we can add one big one later
+facets = sensitivity.plot_grid(col_wrap=5, cmap='RdBu_r', vmin=min_temp, vmax=max_temp,
+                               figsize=(24, 12), add_colorbar=False)
+fig = facets.fig
 
 # Add a single colorbar for the whole figure
 sm = plt.cm.ScalarMappable(cmap='RdBu_r', norm=plt.Normalize(vmin=min_temp, vmax=max_temp))
@@ -98,7 +98,7 @@ cbar_ax = fig.add_axes([0.92, 0.15, 0.02, 0.7]) # [left, bottom, width, height]
 fig.colorbar(sm, cax=cbar_ax, label='Temperature (°C)')
 
 plt.suptitle("Global Temperature Sensitivity Analysis (-6°C to +12°C)", fontsize=20, y=0.95)
-plt.subplots_adjust(wspace=0.1, hspace=0.3)
+fig.subplots_adjust(right=0.9, wspace=0.1, hspace=0.3)
 plt.show()
 
 ###
@@ -23,98 +23,77 @@ import matplotlib.pyplot as plt
 # !pip install --no-binary cartopy cartopy
 import cartopy.crs as ccrs
 
+# Offline place-name table; geopy/Nominatim is only used on a local miss
 # !pip install geopy
-from geopy.geocoders import Nominatim
+from gazetteer import get_gazetteer
 
 from IPython.display import clear_output
 
-def get_granular_temp_offset(age_ma):
+from paleo_temperature_curve import GRANULAR_TEMP_CURVE
+from geodesy import EARTH_RADIUS_KM, haversine
+
+def get_granular_temp_offset(age_ma, curve=GRANULAR_TEMP_CURVE):
     """
     Interpolates climate offsets based on major thermal events.
     Values represent the global anomaly relative to the modern baseline.
+    Accepts a scalar or an array of ages; pass another TempOffsetCurve to swap anchors.
     """
-    # Key anchor points (Age_Ma: Temp_Offset)
-    # Anchor points for interpolation (Age_Ma: Temp_Offset_Celsius)
-    # Includes high-resolution spikes for PETM and EECO
-    anchors = {
-        0: 0.0, 34: 0.5, 52: 12.0, 56: 15.0, 66: 8.0, 
-        92: 13.0, 145: 6.0, 201: 9.0, 252: 16.0, 300: -4.0, 360: 2.0,
-        444: -6.0, 520: 10.0, 800: -15.0
-    }
-    
-    ages = sorted(anchors.keys())
-    # Linear interpolation to find the specific offset for any age
-    return float(np.interp(age_ma, ages, [anchors[a] for a in ages]))
+    # Anchor arrays are sorted once when the curve is built (paleo_temperature_curve.py)
+    return curve(age_ma)
+
+# Plate boxes for the kinematic approximation, checked in order (first match wins).
+# (name, (lat_min, lat_max), (lon_min, lon_max), (lat_drift_rate, lon_drift_rate))
+# Bounds are exclusive. Anything outside every box uses the North American default.
+DEFAULT_DRIFT_RATES = (0.18, 0.35) # Degrees North / West per Ma
+PLATE_DRIFT_BOXES = [
+    # Europe / Eurasia (moves slower north/east)
+    ("Eurasian", (20, np.inf), (-20, 50), (0.12, -0.15)),
+    # Australia (fastest plate, moves rapidly north)
+    ("Australian", (-np.inf, 0), (110, 155), (0.65, -0.20)),
+    ("South American", (-60, 15), (-90, -30), (0.10, 0.25)),
+    ("African", (-35, 38), (-20, 55), (0.08, -0.05)),
+]
 
 def calculate_approx_paleo_position(location_name, age_ma, lat=None, lon=None):
 
     # 1. Coordinate Handling
-    # Common city coordinates to bypass geocoder if needed
-    # Defines local database (always defined first before they're used 
-    # to avoid UnboundLocalError)
-    city_db = {
-        "New York, NY": (40.71, -74.01),
-        "London, UK": (51.51, -0.13),
-        "Syndney, AU": (-33.87, 151.21),
-        "Lagos, NG": (6.45, 3.38),
-        "Buenos Aires, AR": (-34.60, -58.38)
-    }
-
     m_lat, m_lon = None, None
 
     # Priority A: User-provided manual coordinates
     if lat is not None and lon is not None:
         m_lat, m_lon = lat, lon
 
-    # Priority B: Try the Geocoder
+    # Priority B: Local gazetteer (seed cities + bulk table + cached geocoder answers),
+    # which only falls through to Nominatim when the name is unknown locally
     if m_lat is None:
-        try:
-            # Use a unique user_agent to help avoid 403 errors
-            geolocator = Nominatim(user_agent="paleo_explorer_v2_unique")
-            loc = geolocator.geocode(location_name, timeout=5)
-            if loc:
-                m_lat, m_lon = loc.latitude, loc.longitude
-                print(f"📡 Geocoder successful for {location_name}")
-        except Exception as e:
-            print(f"⚠️ Geocoder blocked or failed ({type(e).__name__}). Switching to Local DB...")
-
-    # Priority C: Local Database Fallback
-    if m_lat is None:
-        if location_name in city_db:
-            m_lat, m_lon = city_db[location_name]
-            print(f"✅ Local database match found for {location_name}")
-        else:
+        hit = get_gazetteer().geocode(location_name)
+        if hit is None:
             print(f"❌ Error: Could not find coordinates for '{location_name}'.")
             return None
 
+        m_lat, m_lon = hit.lat, hit.lon
+        if hit.source == "geocoder":
+            print(f"📡 Geocoder successful for {location_name}")
+        elif hit.source == "fuzzy":
+            print(f"✅ Closest local match for {location_name}: {hit.matched_name}")
+        else:
+            print(f"✅ Local database match found for {location_name}")
+
     # 2. Mathematical Approximation of North American Plate Motion
     # Historically, North America has drifted north/west since the Jurassic.
     # Estimate a drift rate of ~0.2 degrees of latitude per million years.
     # Dynamic Drift Rate Selection; default rates (North America)
-    lat_drift_rate = 0.18 # Degree North per Ma
-    lon_drift_rate = 0.35 # Degrees West per Ma
-
-    # First attempt at dynamic adjustment based on modern coordinates.
-    if m_lat > 20 and -20 < m_lon < 50:
-        # Europe / Eurasia (moves slower north/east)
-        lat_drift_rate, lon_drift_rate = 0.12, -0.15
-        print("📍 Applying Eurasian plate drift rates.")
-
-    elif m_lat < 0 and 110 < m_lon < 155:
-        # Australia (fastest plate, moves rapidly north)
-        lat_drift_rate, lon_drift_rate = 0.65, -0.20
-        print("📍 Applying Australian plate drift rates.")
-
-    elif -60 < m_lat < 15 and -90 < m_lon < -30:
-        lat_drift_rate, lon_drift_rate = 0.10, 0.25  
-        print("📍 Applying South American plate drift rates.")
-    
-    elif -35 < m_lat < 38 and -20 < m_lon < 55:
-        lat_drift_rate, lon_drift_rate = 0.08, -0.05 # Africa
-        print("📍 Applying African plate drift rates.")
+    lat_drift_rate, lon_drift_rate = DEFAULT_DRIFT_RATES
+    plate_name = "default (North American)"
 
-    else:
-        print("📍 Applying default (North American) plate drift rates.")
+    # First matching plate box wins (same order as the original if/elif chain).
+    for name, (lat_lo, lat_hi), (lon_lo, lon_hi), rates in PLATE_DRIFT_BOXES:
+        if lat_lo < m_lat < lat_hi and lon_lo < m_lon < lon_hi:
+            lat_drift_rate, lon_drift_rate = rates
+            plate_name = name
+            break
+
+    print(f"📍 Applying {plate_name} plate drift rates.")
 
     # 3. Physics calculations
     p_lat = m_lat - (lat_drift_rate * age_ma)
@@ -144,10 +123,7 @@ def calculate_approx_paleo_position(location_name, age_ma, lat=None, lon=None):
     paleo_mat = (28 * math.cos(math.radians(p_lat))) + temp_offset
 
     # Haversine Distance (km)
-    R = 6371
-    dlat, dlon = math.radians(p_lat-m_lat), math.radians(p_lon-m_lon)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(m_lat)) * math.cos(math.radians(p_lat)) * math.sin(dlon/2)**2
-    dist_km = R * (2 * math.atan2(math.sqrt(a), math.sqrt(1-a)))
+    dist_km = float(haversine(m_lat, m_lon, p_lat, p_lon))
 
     return {
         "modern": (round(m_lat, 2), round(m_lon, 2)),
@@ -157,6 +133,65 @@ def calculate_approx_paleo_position(location_name, age_ma, lat=None, lon=None):
         "dist": round(dist_km, 0)
     }
 
+# Structured output of the batch API (one record per site/age pair).
+PALEO_BATCH_DTYPE = np.dtype([
+    ("modern_lat", "f8"), ("modern_lon", "f8"), ("age", "f8"),
+    ("paleo_lat", "f8"), ("paleo_lon", "f8"),
+    ("mat", "f8"), ("offset", "f8"), ("dist", "f8")
+])
+
+def calculate_approx_paleo_position_batch(lats, lons, ages, curve=GRANULAR_TEMP_CURVE):
+    """
+    Array version of calculate_approx_paleo_position for whole site catalogues.
+    lats, lons and ages are broadcast against each other, so
+    (lats[:, None], lons[:, None], ages[None, :]) gives a sites x ages table.
+    Returns a PALEO_BATCH_DTYPE structured array (unrounded, no printing).
+    curve swaps the temperature-offset anchors (see paleo_temperature_curve.py).
+    """
+    m_lat, m_lon, age_ma = np.broadcast_arrays(
+        np.asarray(lats, dtype=float),
+        np.asarray(lons, dtype=float),
+        np.asarray(ages, dtype=float)
+    )
+
+    # 1. Drift rates per site via boolean masks (np.select keeps if/elif order)
+    in_box = [
+        (lat_lo < m_lat) & (m_lat < lat_hi) & (lon_lo < m_lon) & (m_lon < lon_hi)
+        for _, (lat_lo, lat_hi), (lon_lo, lon_hi), _ in PLATE_DRIFT_BOXES
+    ]
+    lat_drift_rate = np.select(in_box, [b[3][0] for b in PLATE_DRIFT_BOXES],
+                               default=DEFAULT_DRIFT_RATES[0])
+    lon_drift_rate = np.select(in_box, [b[3][1] for b in PLATE_DRIFT_BOXES],
+                               default=DEFAULT_DRIFT_RATES[1])
+
+    # 2. Physics calculations
+    p_lat = m_lat - (lat_drift_rate * age_ma)
+    p_lon = m_lon + (lon_drift_rate * age_ma)
+
+    # 3. Supercontinent pull windows (Pangea 180-450 Ma, Rodinia 750-1000 Ma)
+    pangea = (age_ma > 180) & (age_ma <= 450)
+    rodinia = (age_ma > 750) & (age_ma <= 1000)
+    pull_strength = np.select(
+        [pangea, rodinia],
+        [np.sin(np.pi * (age_ma - 180) / 270), np.sin(np.pi * (age_ma - 750) / 250)],
+        default=0.0
+    )
+    p_lat = p_lat * (1 - pull_strength)
+    p_lon = p_lon * (1 - pull_strength)
+
+    # 4. Temperature gradient: MAT = 28 * cos(lat) + Greenhouse Offset
+    temp_offset = get_granular_temp_offset(age_ma, curve)
+    paleo_mat = 28 * np.cos(np.radians(p_lat)) + temp_offset
+
+    # 5. Haversine Distance (km)
+    dist_km = haversine(m_lat, m_lon, p_lat, p_lon)
+
+    out = np.empty(m_lat.shape, dtype=PALEO_BATCH_DTYPE)
+    out["modern_lat"], out["modern_lon"], out["age"] = m_lat, m_lon, age_ma
+    out["paleo_lat"], out["paleo_lon"] = p_lat, p_lon
+    out["mat"], out["offset"], out["dist"] = paleo_mat, temp_offset, dist_km
+    return out
+
 import ipywidgets as widgets
 from IPython.display import display, clear_output
 
@@ -167,25 +202,81 @@ run_button = widgets.Button(description="Calculate Paleo-Position", button_style
 exit_button = widgets.Button(description="Exit Program", button_style='danger')
 output_area = widgets.Output()
 
-def calculate_spherical_drift(m_lat, m_lon, age_ma):
-    # 1. The Wilson Cycle (Supercontinent Pulse)
-    # Continents cluster roughly every 450-500 million years.
-    cycle_period = 500 
-    oscillation = math.sin(2 * math.pi * age_ma / cycle_period)
-    
-    # 2. Rotational Drift
-    # Instead of linear drift, we treat motion as an angular shift
-    drift_scale = 0.25 # Degrees per Ma
-    
-    # Calculate paleo-lat/lon with a circular/oscillating component
-    p_lat = m_lat * math.cos(math.radians(drift_scale * age_ma)) + (20 * oscillation)
-    p_lon = m_lon + (drift_scale * age_ma * oscillation)
-    
-    # 3. Spherical Safety (Clamping)
-    p_lat = max(min(p_lat, 90), -90)
+# Spherical drift model parameters
+WILSON_CYCLE_MA = 500 # Continents cluster roughly every 450-500 million years
+DRIFT_SCALE = 0.25 # Degrees per Ma
+
+# Output of spherical_drift_state: position plus instantaneous velocity.
+# v_lat / v_lon in degrees per Ma (toward the past), speed in cm/year, heading in
+# degrees clockwise from north.
+DRIFT_STATE_DTYPE = np.dtype([
+    ("p_lat", "f8"), ("p_lon", "f8"),
+    ("v_lat", "f8"), ("v_lon", "f8"),
+    ("speed", "f8"), ("heading", "f8")
+])
+
+def spherical_drift_state(m_lat, m_lon, age_ma):
+    """
+    Paleo-position and instantaneous drift velocity from calculate_spherical_drift's
+    model, with the velocity taken analytically from the oscillation and rotation
+    terms (no second evaluation). Inputs broadcast, so a whole age series is one
+    call: spherical_drift_state(lat, lon, np.linspace(0, 1000, 2001))["speed"].
+    Returns a DRIFT_STATE_DTYPE structured array (0-d for scalar input).
+    """
+    m_lat, m_lon, age_ma = np.broadcast_arrays(
+        np.asarray(m_lat, dtype=float),
+        np.asarray(m_lon, dtype=float),
+        np.asarray(age_ma, dtype=float)
+    )
+
+    # 1. The Wilson Cycle (Supercontinent Pulse) and its rate of change
+    omega = 2 * np.pi / WILSON_CYCLE_MA
+    oscillation = np.sin(omega * age_ma)
+    d_oscillation = omega * np.cos(omega * age_ma)
+
+    # 2. Rotational Drift: angular shift of DRIFT_SCALE degrees per Ma
+    k = np.radians(DRIFT_SCALE)
+    p_lat = m_lat * np.cos(k * age_ma) + (20 * oscillation)
+    p_lon = m_lon + (DRIFT_SCALE * age_ma * oscillation)
+    v_lat = -m_lat * k * np.sin(k * age_ma) + (20 * d_oscillation)
+    v_lon = DRIFT_SCALE * (oscillation + age_ma * d_oscillation)
+
+    # 3. Spherical Safety (Clamping): a point pinned at a pole does not move
+    pinned = np.abs(p_lat) > 90
+    p_lat = np.clip(p_lat, -90, 90)
     p_lon = ((p_lon + 180) % 360) - 180
-    
-    return p_lat, p_lon
+    v_lat = np.where(pinned, 0.0, v_lat)
+    v_lon = np.where(pinned, 0.0, v_lon)
+
+    # 4. Speed on the sphere: km/Ma from the north/east components (1 km/Ma = 0.1 cm/year)
+    v_north = EARTH_RADIUS_KM * np.radians(v_lat)
+    v_east = EARTH_RADIUS_KM * np.cos(np.radians(p_lat)) * np.radians(v_lon)
+
+    out = np.empty(m_lat.shape, dtype=DRIFT_STATE_DTYPE)
+    out["p_lat"], out["p_lon"] = p_lat, p_lon
+    out["v_lat"], out["v_lon"] = v_lat, v_lon
+    out["speed"] = np.hypot(v_north, v_east) * 0.1
+    out["heading"] = np.degrees(np.arctan2(v_east, v_north)) % 360
+    return out
+
+def calculate_spherical_drift(m_lat, m_lon, age_ma):
+    # Paleo-position only (see spherical_drift_state for velocity and array input)
+    state = spherical_drift_state(m_lat, m_lon, age_ma)
+    return float(state["p_lat"]), float(state["p_lon"])
+
+def plot_drift_speed_curve(m_lat, m_lon, max_age=1000, title=None):
+    # Continuous speed curve over 0-max_age Ma from one array evaluation
+    ages = np.linspace(0, max_age, 2001)
+    state = spherical_drift_state(m_lat, m_lon, ages)
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.plot(ages, state["speed"], color='firebrick')
+    ax.set_xlim(max_age, 0) # Past on the left, present on the right
+    ax.set_xlabel("Age (Ma)")
+    ax.set_ylabel("Paleo-Speed (cm/year)")
+    ax.set_title(title or f"Spherical drift speed at ({m_lat}°, {m_lon}°)")
+    ax.grid(linestyle='--', alpha=0.6)
+    plt.show()
+    plt.close(fig)
 
 def on_button_clicked(b):
     with output_area:
@@ -197,21 +288,10 @@ def on_button_clicked(b):
 
         if res:
             m_lat, m_lon = res['modern']
-            p_lat, p_lon = calculate_spherical_drift(m_lat, m_lon, age_val)
-
-            # Calculate "Paleo-Speed" (Velocity)
-            test_age = age_val - 1 if age_val >= 1 else age_val + 1
-            p_lat_next, p_lon_next = calculate_spherical_drift(m_lat, m_lon, test_age)
-            
-            # Use Haversine to find distance moved in 1 Million Years.
-            R = 6371 # Earth radius in km
-            dlat = math.radians(p_lat_next - p_lat)
-            dlon = math.radians(p_lon_next - p_lon)
-            a = math.sin(dlat/2)**2 + math.cos(math.radians(p_lat)) * math.cos(math.radians(p_lat_next)) * math.sin(dlon/2)**2
-            delta_dist_km = R * (2 * math.atan2(math.sqrt(a), math.sqrt(1-a)))
-            
-            # Convert km/Ma to cm/year (1 km/Ma = 0.1 cm/year).
-            speed_cm_yr = delta_dist_km * 0.1
+            # Position and instantaneous "Paleo-Speed" (Velocity) in one evaluation
+            state = spherical_drift_state(m_lat, m_lon, age_val)
+            p_lat, p_lon = float(state["p_lat"]), float(state["p_lon"])
+            speed_cm_yr = float(state["speed"])
 
             print(f"✅ {city_name} at {age_val} Ma")
             print(f"📊 Modern Location: {m_lat}°, {m_lon}°")
@@ -0,0 +1,126 @@
+"""
+File: video_sink.py
+Description: Streams raw RGBA frames straight into an ffmpeg subprocess over stdin
+             (no PNG encode/decode, no shared frame folder). Each run encodes inside
+             its own temporary workspace and reports throughput in frames per second.
+Library: subprocess + ffmpeg (+ numpy / matplotlib Agg canvas)
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+FFMPEG_BINARY = os.environ.get("PALEO_FFMPEG", "ffmpeg")
+
+
+def figure_rgba(fig):
+    # Draw a matplotlib figure on its Agg canvas -> (height, width, 4) uint8 array
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    canvas = fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())
+
+
+class VideoSink:
+    """
+    with VideoSink("movie.mp4", fps=7) as sink:
+        for frame in frames:
+            sink.write_rgba(frame)   # or sink.write_figure(fig)
+
+    The encoder starts on the first frame (its size fixes the video size). The
+    video is written inside a private temp workspace and moved into place on a
+    clean close, so concurrent runs never see each other's partial files.
+    """
+
+    def __init__(self, output_path, fps=7, crf=24, workspace_root=None, ffmpeg=FFMPEG_BINARY):
+        self.output_path = output_path
+        self.fps = fps
+        self.crf = crf
+        self.workspace_root = workspace_root
+        self.ffmpeg = ffmpeg
+        self.workspace = None
+        self.size = None
+        self.frames = 0
+        self.stats = {}
+        self._process = None
+        self._started = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(abort=exc_type is not None)
+
+    def open(self):
+        if shutil.which(self.ffmpeg) is None:
+            raise RuntimeError(f"ffmpeg not found ('{self.ffmpeg}'); install it or set PALEO_FFMPEG.")
+        self.workspace = tempfile.mkdtemp(prefix="paleo_video_", dir=self.workspace_root)
+        self._started = time.perf_counter()
+        return self
+
+    def _start_encoder(self, width, height):
+        self.size = (width, height)
+        self._tmp_output = os.path.join(self.workspace, os.path.basename(self.output_path))
+        command = [
+            self.ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}",
+            "-r", str(self.fps), "-i", "-",
+            # libx264 + yuv420p needs even dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-vcodec", "libx264", "-crf", str(self.crf), "-pix_fmt", "yuv420p",
+            self._tmp_output
+        ]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stderr=subprocess.PIPE, cwd=self.workspace)
+
+    def write_rgba(self, frame):
+        # frame: (height, width, 4) uint8 array (or anything exposing that buffer)
+        frame = np.asarray(frame, dtype=np.uint8)
+        if frame.ndim != 3 or frame.shape[2] != 4:
+            raise ValueError(f"Expected an (height, width, 4) RGBA frame, got {frame.shape}.")
+
+        height, width = frame.shape[:2]
+        if self._process is None:
+            self._start_encoder(width, height)
+        elif (width, height) != self.size:
+            raise ValueError(f"Frame size {width}x{height} differs from the video size "
+                             f"{self.size[0]}x{self.size[1]}.")
+
+        self._process.stdin.write(np.ascontiguousarray(frame).tobytes())
+        self.frames += 1
+
+    def write_figure(self, fig):
+        self.write_rgba(figure_rgba(fig))
+
+    def close(self, abort=False):
+        # Finish encoding, move the video into place and remove the workspace
+        if self.workspace is None:
+            return self.stats
+
+        try:
+            if self._process is not None:
+                self._process.stdin.close()
+                errors = self._process.stderr.read().decode(errors="replace")
+                if self._process.wait() != 0 and not abort:
+                    raise RuntimeError(f"ffmpeg failed: {errors.strip()}")
+                if not abort:
+                    folder = os.path.dirname(os.path.abspath(self.output_path))
+                    os.makedirs(folder, exist_ok=True)
+                    shutil.move(self._tmp_output, self.output_path)
+
+            seconds = time.perf_counter() - self._started
+            self.stats = {"frames": self.frames, "seconds": seconds,
+                          "fps": self.frames / seconds if seconds > 0 else 0.0}
+            if not abort:
+                print(f"Encoded {self.frames} frames in {seconds:.1f}s "
+                      f"({self.stats['fps']:.1f} frames/s) -> {self.output_path}")
+        finally:
+            shutil.rmtree(self.workspace, ignore_errors=True)
+            self.workspace = None
+            self._process = None
+        return self.stats